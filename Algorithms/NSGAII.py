@@ -29,9 +29,6 @@ import time
 from deap import tools, base
 from deap.tools import sortLogNondominated
 
-from Benchmarks.POM3 import get_pom3
-from Stats.statsReporting import write_results_to_txt
-
 
 def _show_pop(pop):
     """
@@ -100,6 +97,9 @@ def nsgaii(model, mu, ngen, cxpb, mutpb):
 
 
 if __name__ == '__main__':
+    from Benchmarks.POM3 import get_pom3
+    from Stats.statsReporting import write_results_to_txt
+
     logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %I:%M:%S %p', stream=sys.stdout,
                         level=logging.DEBUG)
     model = get_pom3('p3b')
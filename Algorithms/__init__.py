@@ -20,3 +20,25 @@
 #  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 #  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 #  THE SOFTWARE.
+
+"""
+Lazy algorithm registry. An algorithm module is imported only when asked for by name.
+"""
+
+import importlib
+
+# name -> (module, function)
+ALGORITHMS = {
+    'nsgaii': ('Algorithms.NSGAII', 'nsgaii'),
+    'riot'  : ('Algorithms.div_conv', 'riot'),
+}
+
+
+def get_algorithm(name):
+    """
+    :param name: one of ALGORITHMS
+    :return: the algorithm function
+    """
+    assert name in ALGORITHMS, "Unknown algorithm " + name
+    module, function = ALGORITHMS[name]
+    return getattr(importlib.import_module(module), function)
@@ -36,7 +36,6 @@ import numpy as np
 import pandas as pd
 from scipy.spatial import distance
 
-from Benchmarks.POM3 import get_pom3
 from Stats.pd_dominance import cull
 
 
@@ -99,6 +98,8 @@ def riot(M, num_anchor=30, num_random=1000):
 
 
 if __name__ == '__main__':
+    from Benchmarks.POM3 import get_pom3
+
     logging.basicConfig(format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %I:%M:%S %p', stream=sys.stdout,
                         level=logging.DEBUG)
     # model = get_xomo('flight')
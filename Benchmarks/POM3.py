@@ -1,12 +1,17 @@
 from __future__ import division
 
 import array
+import random
 
 import numpy as np
 import pandas as pd
 from deap import base, creator
 
-from Benchmarks.POM3_Base.pom3 import pom3
+from Benchmarks.POM3_Base.pom3 import pom3, simulation_stream
+from Benchmarks.POM3_Base.pom3_batch import pom3_batch
+
+
+MIN_REPLICATES = 3  # replicates before a configuration may stop, see POM3.eval_pd_df
 
 
 class POM3(object):
@@ -24,8 +29,19 @@ class POM3(object):
             if min(val) == max(val):
                 self.bound[key] = (min(val), max(val) + 0.000001)  # avoid divide-by-zero error
 
+        self.lows = np.array([self.bound[n][0] for n in names])
+        self.ups = np.array([self.bound[n][1] for n in names])
+
         self.decNum = len(names)
         self.decs = names
+
+        # Simulation random sources. If seed is set, the i-th evaluation in the run draws everything (requirements,
+        # shuffles) from simulation_stream(seed, i). With crn (common random numbers), all evaluations share the
+        # stream 0, thus the same requirements for the same size. Otherwise all draw from the random module in turn.
+        self.seed = None
+        self.crn = False
+        self.evaluated = 0
+        self.profile = None  # pom3_profile timing the simulations, see POM3_Base/pom3_profile.py
         self.objNum = 3
         self.objs = ['o' + str(i) + '_' for i in range(self.objNum)]
         self.obj_bound = obj_bound
@@ -47,7 +63,7 @@ class POM3(object):
             dind.append(v * (M - m) + m)
 
         p3 = pom3()
-        output = p3.simulate(dind)
+        output = p3.simulate(dind, self._streams(self._indices(1))[0], self.profile)
         if not normalized:
             res = output
         else:
@@ -77,10 +93,108 @@ class POM3(object):
 
         return df
 
-    def eval_pd_df(self, df, normalized=True, force_eval_all=False):
-        for ind in df.index:
-            if (not force_eval_all) and df.loc[ind, 'o0_'] != -1: continue
-            self._eval(df, ind, normalized=normalized)
+    def _indices(self, n, indices=None):
+        """
+        :param n: number of evaluations
+        :param indices: evaluation indices. following the evaluation counter if not set
+        :return: np.array of evaluation indices
+        """
+        if indices is None:
+            indices = np.arange(self.evaluated, self.evaluated + n)
+        self.evaluated += n
+        return np.asarray(indices, dtype=int)
+
+    def _streams(self, indices, replicate=0):
+        """
+        :param indices: evaluation indices
+        :param replicate: replicate of the evaluations
+        :return: list of random sources for pom3.simulate
+        """
+        if self.seed is None:
+            return [random] * len(indices)
+        if self.crn:
+            indices = np.zeros(len(indices), dtype=int)
+        return [simulation_stream(self.seed, i, replicate) for i in indices]
+
+    def _simulate(self, X, indices, replicate=0, normalized=True):
+        """one lock-step batch. See POM3_Base/pom3_batch.py"""
+        res = pom3_batch().simulate(X.tolist(), self._streams(indices, replicate), self.profile)
+        res = np.array(res, dtype=float).reshape(len(X), self.objNum)
+        if normalized:
+            m, M = np.array(self.obj_bound, dtype=float).T
+            res = np.clip((res - m) / (M - m), 0, 1)
+        return res
+
+    def _settled(self, mean, m2, reps, tolerance, confidence, normalized):
+        """
+        :return: bool np.array. configurations whose objective means are precise enough, or which are certainly
+                 dominated (the confidence interval of another configuration is better on all objectives)
+        """
+        from scipy.stats import t as student  # only replication mode needs scipy, kept out of the model import
+
+        var = m2 / np.maximum(reps - 1, 1)[:, None]
+        half = student.ppf((1 + confidence) / 2, np.maximum(reps - 1, 1))[:, None] * np.sqrt(var / reps[:, None])
+        m, M = np.array(self.obj_bound, dtype=float).T
+        precise = (half <= tolerance * (1 if normalized else M - m)).all(axis=1)
+        low, high = mean - half, mean + half
+        better = high[None, :, :] <= low[:, None, :]  # [a, b, o]: b is certainly better than a on o
+        dominated = (better.all(axis=2) & (high[None, :, :] < low[:, None, :]).any(axis=2)).any(axis=1)
+        return precise | dominated
+
+    def eval_pd_df(self, df, normalized=True, force_eval_all=False, indices=None, replicates=1, tolerance=None,
+                   confidence=0.95):
+        """
+        Evaluating all (un-evaluated) configurations in one lock-step batch. See POM3_Base/pom3_batch.py
+        Same results as evaluating them one by one with _eval.
+        Replication mode (replicates > 1): every configuration is simulated up to replicates times, one lock-step
+        batch per round. With a tolerance, a configuration stops after MIN_REPLICATES rounds once the confidence
+        intervals of its objective means are narrower than tolerance, or once another configuration of the batch
+        certainly dominates it. The objectives o*_ are then the means, and the columns o<i>var (variance of the
+        replicates) and reps (number of replicates) are added.
+        :param df: pd.DataFrame from init_random_pop
+        :param normalized:
+        :param force_eval_all: re-evaluate configurations whose o0_ is not -1
+        :param indices: evaluation indices of the configurations, only used when self.seed is set.
+                        pass them explicitly when splitting a batch across processes
+        :param replicates: maximum number of simulations per configuration
+        :param tolerance: half width of the confidence intervals, as a fraction of the objective bounds (obj_bound).
+                          None: all configurations run all the replicates
+        :param confidence: level of the confidence intervals
+        :return:
+        """
+        todo = df.index if force_eval_all else df.index[df['o0_'] == -1]
+        if len(todo) == 0:
+            return
+
+        X = df.loc[todo, self.decs].values * (self.ups - self.lows) + self.lows
+        ids = self._indices(len(todo), indices)
+        df[self.objs] = df[self.objs].astype(float)
+        if replicates == 1:
+            df.loc[todo, self.objs] = np.round(self._simulate(X, ids, normalized=normalized), 4)
+            return
+
+        # running means and sums of squared deviations (Welford)
+        reps = np.zeros(len(todo), dtype=int)
+        mean = np.zeros((len(todo), self.objNum))
+        m2 = np.zeros((len(todo), self.objNum))
+        active = np.ones(len(todo), dtype=bool)
+        for r in range(replicates):
+            rows = np.flatnonzero(active)
+            res = self._simulate(X[rows], ids[rows], r, normalized)
+            reps[rows] += 1
+            delta = res - mean[rows]
+            mean[rows] += delta / reps[rows][:, None]
+            m2[rows] += delta * (res - mean[rows])
+            if tolerance is not None and r + 1 >= MIN_REPLICATES:
+                active &= ~self._settled(mean, m2, reps, tolerance, confidence, normalized)
+                if not active.any():
+                    break
+
+        df.loc[todo, self.objs] = np.round(mean, 4)
+        var = m2 / np.maximum(reps - 1, 1)[:, None]
+        for i in range(self.objNum):
+            df.loc[todo, 'o%dvar' % i] = var[:, i]
+        df.loc[todo, 'reps'] = reps
 
     def pd_to_deap(self, pandas_df):
         """
@@ -25,6 +25,10 @@
 
 """
 
+import random
+
+import numpy as np
+
 from Benchmarks.POM3_Base.pom3_requirements import *
 from Benchmarks.POM3_Base.pom3_teams import *
 
@@ -42,27 +46,51 @@ class pom3_decisions:
         p3d.team_size = X[8]
 
 
+def simulation_stream(seed, index, replicate=0):
+    """
+    Independent random source of one simulation
+    :param seed: run seed
+    :param index: evaluation (configuration) index in the run
+    :param replicate: replicate of the evaluation, see POM3.eval_pd_df
+    :return: random.Random
+    """
+    key = (int(index),) if replicate == 0 else (int(index), int(replicate))
+    return random.Random(int(np.random.SeedSequence(seed, spawn_key=key).generate_state(1, np.uint64)[0]))
+
+
 class pom3:
-    def simulate(p3, inputs):
+    def simulate(p3, inputs, rng=random, profile=None):
+        """
+        :param inputs: decision vector
+        :param rng: random.Random drawing everything of this simulation. the random module by default
+        :param profile: pom3_profile timing the phases, if set. See pom3_profile.py
+        :return: [cost, 1 - score, idle]
+        """
 
         # # # # # # # # # # #
         # 0) Initialization #
         # # # # # # # # # # #
 
+        t = profile.tic() if profile else None
         POM3_DECISIONS = pom3_decisions(inputs)
-        numberOfShuffles = random.randint(2, 6)
+        numberOfShuffles = rng.randint(2, 6)
 
         # # # # # # # # # # # # # # #
         # 1) Generate Requirements  #
         # # # # # # # # # # # # # # #
 
-        POM3_REQUIREMENTS = pom3_requirements(POM3_DECISIONS)
+        POM3_REQUIREMENTS = pom3_requirements(POM3_DECISIONS, rng)
+        if profile: t = profile.toc('requirements', t)
 
         # # # # # # # # # # #
         # 2) Generate Teams #
         # # # # # # # # # # #
 
-        POM3_TEAMS = pom3_teams(POM3_REQUIREMENTS, POM3_DECISIONS)
+        # the shuffles draw from a stream of their own (discovery and value drift), seeded by rng
+        POM3_TEAMS = pom3_teams(POM3_REQUIREMENTS, POM3_DECISIONS, np.random.default_rng(rng.getrandbits(64)))
+        if profile:
+            t = profile.toc('teams', t)
+            profile.count(POM3_REQUIREMENTS, POM3_TEAMS.teams)
 
         # # # # # # # #
         # 3) Shuffle  #
@@ -73,11 +101,17 @@ class pom3:
 
             for team in POM3_TEAMS.teams:
                 team.updateBudget(numberOfShuffles)
+                if profile: t = profile.toc('budget', t)
                 team.collectAvailableTasks(POM3_REQUIREMENTS)
+                if profile: t = profile.toc('collect', t)
                 team.applySortingStrategy()
+                if profile: t = profile.toc('sort', t)
                 team.executeAvailableTasks()
+                if profile: t = profile.toc('execute', t)
                 team.discoverNewTasks()
+                if profile: t = profile.toc('discover', t)
                 team.updateTasks()
+                if profile: t = profile.toc('update', t)
 
         # # # # # # # # # # # # #
         # 4) Objective Scoring  #
@@ -89,47 +123,51 @@ class pom3:
             value_sum += team.value_total
             available_sum += team.numAvailableTasks
             completion_sum += team.numCompletedTasks
-            for task in team.tasks:
-                if task.val.visible:
-                    total_tasks += 1
-
-            for task in team.tasks:
-                if task.val.done == True:
-                    god_cost_sum += task.val.cost
-                    god_value_sum += task.val.value
-
-        if cost_sum == 0:
-            our_frontier = 0.0
-        else:
-            our_frontier = value_sum / cost_sum
-
-        if god_cost_sum == 0:
-            god_frontier = 0.0
-        else:
-            god_frontier = god_value_sum / god_cost_sum
-
-        if god_frontier == 0.0:
-            score = 0.0
-        else:
-            score = our_frontier / god_frontier
-
-        if completion_sum == 0:
-            cost = 0
-        else:
-            cost = cost_sum / completion_sum
-
-        if available_sum == 0:
-            idle = 0
-        else:
-            idle = 1 - completion_sum / float(available_sum)
-
-        if total_tasks == 0:
-            completion = 0
-        else:
-            completion = completion_sum / float(total_tasks)
-
-        # return [cost, score, completion, idle]
-        return [cost, 1 - score, idle]
+
+        # every task belongs to exactly one team
+        heap = POM3_REQUIREMENTS.heap
+        total_tasks = int(np.count_nonzero(heap.visible))
+        god_cost_sum = seqSum(heap.cost[heap.done])
+        god_value_sum = seqSum(heap.value[heap.done])
+
+        res = pom3_score(cost_sum, value_sum, god_cost_sum, god_value_sum, completion_sum, available_sum, total_tasks)
+        if profile: profile.toc('scoring', t)
+        return res
+
+
+def pom3_score(cost_sum, value_sum, god_cost_sum, god_value_sum, completion_sum, available_sum, total_tasks):
+    if cost_sum == 0:
+        our_frontier = 0.0
+    else:
+        our_frontier = value_sum / cost_sum
+
+    if god_cost_sum == 0:
+        god_frontier = 0.0
+    else:
+        god_frontier = god_value_sum / god_cost_sum
+
+    if god_frontier == 0.0:
+        score = 0.0
+    else:
+        score = our_frontier / god_frontier
+
+    if completion_sum == 0:
+        cost = 0
+    else:
+        cost = cost_sum / completion_sum
+
+    if available_sum == 0:
+        idle = 0
+    else:
+        idle = 1 - completion_sum / float(available_sum)
+
+    if total_tasks == 0:
+        completion = 0
+    else:
+        completion = completion_sum / float(total_tasks)
+
+    # return [cost, score, completion, idle]
+    return [cost, 1 - score, idle]
 
 
 # Test Code
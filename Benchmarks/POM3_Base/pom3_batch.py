@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2018, Jianfeng Chen <jchen37@ncsu.edu>
+# vim: set ts=4 sts=4 sw=4 expandtab smartindent:
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+
+"""
+Lock-step POM3 simulation of a batch of configurations.
+The requirement forests and teams are generated one configuration after the other, exactly as pom3.simulate does.
+The forests are then concatenated into shared flat arrays, with one row per (configuration, team), and the shuffles
+advance all rows together with numpy operations over a (rows x team tasks) window.
+
+Within a shuffle, the teams of a configuration run one after the other. A team only sees the work of the teams
+before it through the unfinished children of the nodes found by its task keys (see requirements_forest.lookup).
+The teams are thus cut into waves (see waves): a team starts a new wave when a team of the current wave can finish
+such a child. The teams of a wave collect their tasks on the same state, then execute together.
+
+The shuffles of a configuration only draw from its own stream (Team.rng). A configuration draws, per shuffle and
+per team, one number for the discovery, then one per team task for the value drift. Hence the whole stream is drawn
+at once here, and the results are the same as calling pom3().simulate(x, rng) on every configuration in turn.
+"""
+
+from __future__ import division
+
+import random
+
+import numpy as np
+
+from Benchmarks.POM3_Base.pom3 import pom3_decisions, pom3_score
+from Benchmarks.POM3_Base.pom3_requirements import pom3_requirements
+from Benchmarks.POM3_Base.pom3_team import MAX_VALUE, seqSum
+from Benchmarks.POM3_Base.pom3_teams import pom3_teams
+
+
+class pom3_batch(object):
+    def simulate(self, inputs, rngs=None, profile=None):
+        """
+        :param inputs: list of decision vectors
+        :param rngs: random.Random of every configuration (see pom3.simulate). the random module if not set
+        :param profile: pom3_profile timing the phases, if set. See pom3_profile.py
+        :return: list of [cost, 1 - score, idle], one per configuration
+        """
+        self.profile = profile
+        if rngs is None:
+            rngs = [random] * len(inputs)
+        configs = [self._generate(x, rng) for x, rng in zip(inputs, rngs)]
+        t = profile.tic() if profile else None
+        self._pack(configs)
+        if profile: profile.toc('pack', t)
+
+        # rows of a step: same wave, and close task counts (the window is as wide as the largest team of the step)
+        steps = list()
+        for g in np.unique(self.group[self.group >= 0]):
+            steps.append(np.flatnonzero(self.group == g))
+        for s in range(self.shuffles.max() if len(inputs) else 0):
+            for members in steps:
+                rows = members[s < self.shuffles[members]]
+                if len(rows):
+                    self._step(rows, s)
+        t = profile.tic() if profile else None
+        res = self._score()
+        if profile: profile.toc('scoring', t)
+        return res
+
+    def _generate(self, x, rng):
+        """requirements and teams of one configuration, as pom3.simulate"""
+        profile = self.profile
+        t = profile.tic() if profile else None
+        d = pom3_decisions(x)
+        numberOfShuffles = rng.randint(2, 6)
+        requirements = pom3_requirements(d, rng)
+        if profile: t = profile.toc('requirements', t)
+        stream = np.random.default_rng(rng.getrandbits(64))
+        teams = pom3_teams(requirements, d, stream).teams
+        if profile:
+            profile.toc('teams', t)
+            profile.count(requirements, teams)
+        return d, numberOfShuffles, requirements.heap, teams, stream.random(
+            numberOfShuffles * (len(teams) + len(requirements.heap)))
+
+    def _pack(self, configs):
+        decisions, shuffles, heaps, teams, draws = zip(*configs) if configs else ([],) * 5
+
+        # nodes of all configurations, concatenated
+        sizes = np.array([len(h) for h in heaps], dtype=int)
+        base = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(int)
+        self.base, self.sizes = base, sizes
+        self.cost = np.concatenate([h.cost for h in heaps] + [[]])
+        self.value = np.concatenate([h.value for h in heaps] + [[]])
+        self.visible = np.concatenate([h.visible for h in heaps] + [np.zeros(0, dtype=bool)])
+        self.done = np.concatenate([h.done for h in heaps] + [np.zeros(0, dtype=bool)])
+        self.pending = np.concatenate([h.pending for h in heaps] + [np.zeros(0, dtype=int)])
+        self.parent = np.concatenate([np.where(h.parent >= 0, h.parent + b, -1) for h, b in zip(heaps, base)] +
+                                     [np.zeros(0, dtype=int)])
+        self.lookup = np.concatenate([h.lookup + b for h, b in zip(heaps, base)] + [np.zeros(0, dtype=int)])
+
+        # random streams of the shuffles, concatenated. stride: draws per shuffle
+        draw_base = np.concatenate([[0], np.cumsum([len(d) for d in draws])[:-1]]).astype(int)
+        self.draws = np.concatenate(list(draws) + [[]])
+
+        # one row per (configuration, team), in team order. rows of configuration b: row_ptr[b]:row_ptr[b + 1]
+        self.row_ptr = np.concatenate([[0], np.cumsum([len(t) for t in teams])]).astype(int)
+        cfg = np.repeat(np.arange(len(teams)), np.diff(self.row_ptr))
+        local = np.array([team.tasks[0] if len(team.tasks) else 0 for ts in teams for team in ts], dtype=int)
+        index = np.concatenate([np.arange(len(t)) for t in teams] + [np.zeros(0, dtype=int)]).astype(int)
+        self.length = np.array([len(team.tasks) for ts in teams for team in ts], dtype=int)
+        self.start = base[cfg] + local  # first task, global id
+        self.income = np.array([team.calcTotalCost() / n for ts, n in zip(teams, shuffles) for team in ts])
+        self.sight = np.array([team.visible for ts in teams for team in ts], dtype=float)  # Team.visible
+        self.budget = np.zeros(len(cfg))
+        self.cost_total = np.zeros(len(cfg))
+        self.value_total = np.zeros(len(cfg))
+        self.num_available = np.zeros(len(cfg), dtype=int)
+        self.num_completed = np.zeros(len(cfg), dtype=int)
+
+        self.shuffles = np.array(shuffles, dtype=int)[cfg]
+        self.plan = np.array([d.plan for d in decisions], dtype=int)[cfg]
+        self.dynamism = np.array([d.dynamism for d in decisions], dtype=float)[cfg]
+        self.culture = np.array([d.culture for d in decisions], dtype=float)[cfg]
+        self.draw_at = draw_base[cfg] + index + local  # discovery draw of the first shuffle
+        self.stride = (np.array([len(t) for t in teams], dtype=int) + sizes)[cfg]
+
+        wave = np.concatenate([waves(h, len(t)) for h, t in zip(heaps, teams)] + [np.zeros(0, dtype=int)])
+        bucket = np.log2(np.maximum(self.length, 1)).astype(int)
+        self.group = np.where(self.length > 0, wave * 64 + bucket, -1)
+
+    def _keys(self, rows, cost, value):
+        plan = self.plan[rows][:, None]
+        return np.select([plan == 0, plan == 1, plan == 2, plan == 3, plan == 4, plan == 5],
+                         [cost, -cost, value, -value, cost / value, -(cost / value)], 0.0)
+
+    def _step(self, rows, s):
+        """one step of the shuffle s, for the teams rows. see pom3.simulate"""
+        profile = self.profile
+        t = profile.tic() if profile else None
+        length = self.length[rows]
+        W = length.max()
+        inside = np.arange(W) < length[:, None]
+        idx = np.where(inside, self.start[rows][:, None] + np.arange(W), 0)
+
+        # updateBudget
+        self.budget[rows] += self.income[rows]
+        if profile: t = profile.toc('budget', t)
+
+        # collectAvailableTasks
+        available = inside & self.visible[idx] & ~self.done[idx] & (self.pending[self.lookup[idx]] == 0)
+        num = available.sum(axis=1)
+        self.num_available[rows] += num
+        if profile: t = profile.toc('collect', t)
+
+        # applySortingStrategy. stable, ties in task order
+        K = num.max()
+        if K:
+            key = np.where(available, self._keys(rows, self.cost[idx], self.value[idx]), np.inf)
+            tasks = np.take_along_axis(idx, np.argsort(key, axis=1, kind='stable')[:, :K], axis=1)
+            valid = np.arange(K) < num[:, None]
+            cost, value = self.cost[tasks], self.value[tasks]
+            least = np.minimum.accumulate(np.where(valid, cost, np.inf)[:, ::-1], axis=1)[:, ::-1]
+            if profile: t = profile.toc('sort', t)
+
+            # executeAvailableTasks
+            budget, cost_total = self.budget[rows], self.cost_total[rows]
+            value_total, completed = self.value_total[rows], self.num_completed[rows]
+            for k in range(K):
+                on = valid[:, k] & (budget >= least[:, k])
+                if not on.any(): break
+                fits = np.flatnonzero(on & (budget - cost[:, k] >= 0))
+                if len(fits) == 0: continue
+                budget[fits] -= cost[fits, k]
+                cost_total[fits] += cost[fits, k]
+                value_total[fits] += value[fits, k]
+                completed[fits] += 1
+                finished = tasks[fits, k]
+                self.done[finished] = True
+                parents = self.parent[finished]
+                np.subtract.at(self.pending, parents[parents >= 0], 1)
+            self.budget[rows], self.cost_total[rows] = budget, cost_total
+            self.value_total[rows], self.num_completed[rows] = value_total, completed
+            if profile: t = profile.toc('execute', t)
+
+        # discoverNewTasks
+        at = self.draw_at[rows] + s * self.stride[rows]
+        sight = self.sight[rows] - np.log(1.0 - self.draws[at]) / (self.dynamism[rows] / 10.0)
+        sight = np.minimum(sight, 1.0)
+        self.sight[rows] = sight
+        self.visible[idx[inside & (np.arange(W) < (sight * length).astype(int)[:, None])]] = True
+        if profile: t = profile.toc('discover', t)
+
+        # updateTasks
+        u = self.draws[np.where(inside, (at + 1)[:, None] + np.arange(W), 0)]
+        dynamism = self.dynamism[rows][:, None]
+        changes = (dynamism * u - dynamism / 2) * self.culture[rows][:, None] / 100.0
+        self.value[idx[inside]] += (MAX_VALUE * np.maximum(0, changes))[inside]
+        if profile: profile.toc('update', t)
+
+    def _score(self):
+        res = list()
+        for b in range(len(self.sizes)):
+            seg = slice(self.base[b], self.base[b] + self.sizes[b])
+            rows = slice(self.row_ptr[b], self.row_ptr[b + 1])
+            done = self.done[seg]
+            res.append(pom3_score(seqSum(self.cost_total[rows]), seqSum(self.value_total[rows]),
+                                  seqSum(self.cost[seg][done]), seqSum(self.value[seg][done]),
+                                  int(self.num_completed[rows].sum()), int(self.num_available[rows].sum()),
+                                  int(np.count_nonzero(self.visible[seg]))))
+        return res
+
+
+def waves(heap, num_teams):
+    """
+    Cutting the teams of a configuration into waves of consecutive teams.
+    Team i is seen by a later team j when i owns a child of the node found by the key of a task of j. Such a team j
+    opens a new wave after the wave of i, so that j collects its tasks after i executed. A later team seeing j
+    does not matter: j collects its tasks before any team of its wave executes.
+    :param heap: requirements_forest, tracked (see pom3_teams)
+    :return: np.array. wave of every team
+    """
+    child = np.flatnonzero(heap.parent >= 0)
+    m = heap.parent[child]
+    count = heap.looked_ptr[m + 1] - heap.looked_ptr[m]
+    # (child, task) for every task looking up the parent of the child
+    at = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count - heap.looked_ptr[m], count)
+    i, j = heap.owner[np.repeat(child, count)], heap.owner[heap.looked_idx[at]]
+    seen = np.full(num_teams, -1)
+    np.maximum.at(seen, j[i < j], i[i < j])  # latest team seen by j
+    wave = np.zeros(num_teams, dtype=int)
+    for j in range(1, num_teams):
+        wave[j] = wave[j - 1] if seen[j] < 0 else max(wave[j - 1], wave[seen[j]] + 1)
+    return wave
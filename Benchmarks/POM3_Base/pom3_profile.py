@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2018, Jianfeng Chen <jchen37@ncsu.edu>
+# vim: set ts=4 sts=4 sw=4 expandtab smartindent:
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+
+"""
+Per-phase instrumentation of the POM3 simulations. Pass a pom3_profile to pom3.simulate or pom3_batch.simulate (or set
+POM3.profile), which then time their phases and count what they built. Without one, nothing is timed.
+
+Phases: requirements, teams, then per shuffle (and team) budget, collect, sort, execute, discover, update, and scoring.
+The batch adds pack (concatenating the configurations); its shuffle phases are timed per lock-step, not per team.
+"""
+
+from __future__ import division
+
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+PHASES = ('requirements', 'teams', 'pack', 'budget', 'collect', 'sort', 'execute', 'discover', 'update', 'scoring')
+
+
+class pom3_profile(object):
+    def __init__(self):
+        self.calls = OrderedDict((p, 0) for p in PHASES)
+        self.wall = OrderedDict((p, 0.0) for p in PHASES)
+        self.cpu = OrderedDict((p, 0.0) for p in PHASES)
+        # simulations, requirements (base ones), tasks (all nodes), teams, dependencies
+        self.counts = OrderedDict((c, 0) for c in ('simulations', 'requirements', 'tasks', 'teams', 'dependencies'))
+
+    @staticmethod
+    def tic():
+        return time.perf_counter(), time.process_time()
+
+    def toc(self, phase, since):
+        """
+        Charging the time since tic to phase
+        :return: a new tic, to time the next phase
+        """
+        now = self.tic()
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+        self.wall[phase] = self.wall.get(phase, 0.0) + now[0] - since[0]
+        self.cpu[phase] = self.cpu.get(phase, 0.0) + now[1] - since[1]
+        return now
+
+    def count(self, requirements, teams):
+        """counting one simulation, once its requirements and teams are built"""
+        heap = requirements.heap
+        self.counts['simulations'] += 1
+        self.counts['requirements'] += requirements.count
+        self.counts['tasks'] += len(heap)
+        self.counts['teams'] += len(teams)
+        self.counts['dependencies'] += len(heap.dep_idx)
+
+    def summary(self):
+        """
+        :return: pd.DataFrame, one row per phase that ran: calls, wall and cpu seconds, share of the wall time
+        """
+        df = pd.DataFrame({'calls': pd.Series(self.calls), 'wall': pd.Series(self.wall), 'cpu': pd.Series(self.cpu)})
+        df = df[df['calls'] > 0]
+        df['wall %'] = 100 * df['wall'] / df['wall'].sum() if len(df) else df['wall']
+        return df
+
+    def __str__(self):
+        n = max(self.counts['simulations'], 1)
+        counts = ', '.join('%s %.1f' % (c, v / n) for c, v in self.counts.items() if c != 'simulations')
+        return ('%d simulations. per simulation: %s\n' % (self.counts['simulations'], counts) +
+                self.summary().round(4).to_string())
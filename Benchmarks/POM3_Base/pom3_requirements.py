@@ -26,61 +26,129 @@
 """
 
 import random
+from collections import OrderedDict
+
+import numpy as np
 
 from Benchmarks.POM3_Base.pom3_requirements_tree import *
 
 
-def random_cost(): return random.randint(1, 100)
+def random_cost(rng=random): return rng.randint(1, 100)
+
+
+def random_value(rng=random): return rng.randint(1, 100)
+
+
+class forest_cache(object):
+    """
+    Bounded LRU cache of generated requirement forests.
+    The draws of the generation only depend on the size and on the state of the random source, the interdependency
+    only decides which candidate dependencies are kept. Hence an entry, keyed by (size, state before), holds the
+    built forest, the candidate dependencies with their dice, and the state after the generation. A hit clones the
+    forest and moves the random source to that state, so the simulation goes on as if the forest was generated.
+    Repeated draws of a stream (common random numbers, replicates of a seeded run) then skip the generation.
+    """
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
 
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return entry
 
-def random_value(): return random.randint(1, 100)
+    def put(self, key, entry):
+        self.entries[key] = entry
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+FOREST_CACHE = forest_cache()
 
 
 class pom3_requirements:
-    def __init__(requirements, decisions):
-        requirements.heap = requirements_tree()
+    def __init__(requirements, decisions, rng=random, cache=FOREST_CACHE):
+        """
+        :param decisions: pom3_decisions
+        :param rng: random.Random (or the random module)
+        :param cache: forest_cache, or None to always generate the forest.
+                      only used with a dedicated stream, the state of the shared random module never repeats
+        """
+        if rng is random:
+            cache = None
+        requirements.rng = rng
         requirements.count = int(2.5 * [3, 10, 30, 100, 300][decisions.size])
         requirements.decisions = decisions
 
+        key = (decisions.size, rng.getstate()) if cache is not None else None
+        entry = cache.get(key) if cache is not None else None
+        if entry is None:
+            entry = requirements.generate()
+            if cache is not None:
+                cache.put(key, entry)
+        else:
+            rng.setstate(entry[2])
+        forest, candidates, _ = entry
+        requirements.heap = forest.copy()
+
+        # Add dependencies, the candidates passing the interdependency die
+        for dep_node, req_node, adderDie in candidates:
+            if adderDie <= decisions.interdependency: requirements.add_dependency(dep_node, req_node)
+        requirements.heap.build_dependencies()
+
+        # the tasks, linearized. node ids are in pre-order already
+        requirements.tasks = np.arange(len(requirements.heap))
+
+    def generate(requirements):
+        """
+        Drawing the forest and the candidate dependencies
+        :return: forest (not to be changed), list of candidates (dep_node, req_node, adderDie), state of rng after
+        """
+        rng = requirements.rng
+        requirements.heap = requirements_forest()
+        requirements.candidates = []
         for i in range(requirements.count):
-            requirements.heap.add_root(Requirement((decisions.size + 1) * random_cost(), random_value()),
-                                       'Base Req #' + str('%.3d' % (i + 1)))
-
-            parent = requirements.heap.tree[i]
+            parent = requirements.heap.add_node(-1, 0, i + 1, (requirements.decisions.size + 1) * random_cost(rng),
+                                                random_value(rng))
             requirements.recursive_adder(parent, 1)
+        requirements.heap.build()
 
-        # Add dependencies
+        # Draw dependencies
+        roots = requirements.heap.roots
         for i in range(requirements.count):
-            rand = random.randint(1, 1000)
+            rand = rng.randint(1, 1000)
             if (rand <= 15):
                 # pick a requirement at this level, of the next base tree
                 level = 0
-                if ((i + 1) < len(requirements.heap.tree)):
-                    req_node = requirements.heap.tree[i + 1]
-                    adderDie = random.randint(1, 100)
-                    if adderDie <= decisions.interdependency: requirements.add_dependency(requirements.heap.tree[i],
-                                                                                          req_node)
-            requirements.recursive_dep_adder(requirements.heap.tree[i], i, 1)
-
-        # linearize the list
-        requirements.tasks = requirements.heap.traverse()
+                if ((i + 1) < len(roots)):
+                    req_node = roots[i + 1]
+                    adderDie = rng.randint(1, 100)
+                    requirements.candidates.append((roots[i], req_node, adderDie))
+            requirements.recursive_dep_adder(roots[i], i, 1)
+        return requirements.heap, requirements.candidates, rng.getstate()
 
     def add_children(self, num, parent, level):
         for c in range(num):
-            parent.add_child(Requirement(random_cost(), random_value()),
-                             "+" * level + 'Child-' + parent.key[0] + parent.key[len(parent.key) - 3] + parent.key[
-                                 len(parent.key) - 2] + parent.key[len(parent.key) - 1] + ' #' + str('%.3d' % (c + 1)),
-                             level)
-            self.recursive_adder(parent.children[c], level + 1)
+            child = self.heap.add_node(parent, level, c + 1, random_cost(self.rng), random_value(self.rng))
+            self.recursive_adder(child, level + 1)
 
     def add_dependency(self, dep_node, req_node):
         # Add a dependency from this node to another node at the same level of the next root
-        # We store the key of the requirement_node in the list of the dependent_node's dependencies
-        dep_node.dependencies.append(req_node)
+        self.heap.add_dependency(dep_node, req_node)
 
     def recursive_adder(self, parent, level):
         # Random exponential chance that we add child node:
-        rand = random.randint(1, 1000)
+        rand = self.rng.randint(1, 1000)
         odds = [15, 30, 60, 120, 240]
 
         for numChildren, chance in enumerate(odds):
@@ -89,10 +157,10 @@ class pom3_requirements:
                 break
 
     def recursive_dep_adder(self, parent, rootIndex, level):
-
-        if (len(parent.children) > 0 and ((rootIndex + 1) < len(self.heap.tree))):
-            if (level <= self.heap.tree[rootIndex + 1].max_depth()):
-                rand = random.randint(1, 1000)
+        children = self.heap.children(parent)
+        if (len(children) > 0 and ((rootIndex + 1) < len(self.heap.roots))):
+            if (level <= self.heap.depth[rootIndex + 1]):
+                rand = self.rng.randint(1, 1000)
                 odds = [15, 30, 60, 120, 240, 500]
 
                 if level > 5:
@@ -102,15 +170,15 @@ class pom3_requirements:
 
                 if (rand <= odds[oddsInd]):
                     # pick a random child at this level of this root
-                    rand = random.randint(0, len(parent.children) - 1)
-                    randChild = parent.children[rand]
+                    rand = self.rng.randint(0, len(children) - 1)
+                    randChild = children[rand]
 
-                    # pick a random node at the level of the next root
-                    levelNodes = self.heap.get_level(self.heap.tree[rootIndex + 1], level)
-                    rand = random.randint(0, len(levelNodes) - 1)
+                    # pick a random subtree of the next root, whose nodes at this level are the candidates
+                    levelNodes = self.heap.children(self.heap.roots[rootIndex + 1])
+                    rand = self.rng.randint(0, len(levelNodes) - 1)
 
                     # add the dependency from randChild to levelNodes[rand]
-                    adderDie = random.randint(1, 100)
-                    if adderDie <= self.decisions.interdependency: self.add_dependency(randChild, levelNodes[rand])
-                for child in parent.children:
+                    adderDie = self.rng.randint(1, 100)
+                    self.candidates.append((randChild, levelNodes[rand], adderDie))
+                for child in children:
                     self.recursive_dep_adder(child, rootIndex, level + 1)
@@ -26,106 +26,172 @@
 
 """
 
-class Requirement(object):
-
-    def __init__(self, c, v):
-        #cost of the task
-        self.cost = c
-        
-        #value of the task (priority)
-        self.value = v
-        
-        #if the task is done or not
-        self.done = False
-        
-        #if the task is visible (invisible tasks technically have not been planned at all by project leaders)
-        self.visible = False
-    
-    def __repr__(self): return "Done? " + str(self.done) + ".  (Cost: " + str(self.cost) + ", Value: " + str(self.value) + ")"
-
-
-class requirements_node(object):
-    def __init__(self, v, k, p=None, c=[], l=0):
-        self.val = v
-        self.key = k
-        self.parent = p
-        self.children = c
-        self.level = l
-        self.dependencies = []
-        
-    def add_child(self, v, k, l):
-        self.children.append(requirements_node(v, k, self, [], l))
-        
-    def __repr__(self):
-        if self.parent:
-            return (" "*self.level + "{Key: " + self.key + ", Val: " + str(self.val) + ", ParentKey = " + self.parent.key + " Dep: " + str(self.dependencies) + "}")
-        else: 
-            return (" "*self.level + "{Key: " + self.key + ", Val: " + str(self.val) + ", ParentKey = None" + " Dep: " + str(self.dependencies) + "}")
+import numpy as np
+
+
+class requirements_forest(object):
+    """
+    Requirement forest as a struct of arrays, no object per node.
+    Nodes are numbered in creation order, which is the pre-order of the forest (and the order of the tasks). Thus the
+    subtree of a node is a contiguous range of ids.
+
+    parent[i]   parent node, -1 for the roots
+    level[i]    0 for the roots
+    number[i]   1-based position among its siblings (or among the roots)
+    key[i]      integer code of the requirement key (see key_str). Keys are NOT unique
+    lookup[i]   first node with the key of i, whose children decide whether i is available (see find_node)
+    cost[i], value[i], done[i], visible[i]
+    children of i:     child_idx[child_ptr[i]:child_ptr[i + 1]]
+    dependencies of i: dep_idx[dep_ptr[i]:dep_ptr[i + 1]]
+
+    Readiness tracking (see track): a task is available when it is visible, not done and the node found by its key has
+    no unfinished children. pending[i] counts the unfinished children of i. reveal and complete are the only state
+    changes, and keep the available tasks of every team up to date.
+    """
 
-    def show(self):
-        print(self)
-        for child in self.children:
-            child.show()
-            
-    def iterative_search(self, k):
-        for child in self.children:
-            if child.key == k: return child
-            else:
-                result = child.iterative_search(k)
-                if result: return result
-                
-    def max_depth(self):
-        max = 0
-        for child in self.children:
-            if child.level > max: max = child.level
-            m = child.max_depth()
-            if m > max: max = m
-        return max
-    
-    def traverse(self):
-        list = []
-        for child in self.children:
-            list.append(child)
-            to_add = child.traverse()
-            for i in to_add:
-                list.append(i)
-        return list
-            
-            
-        
-class requirements_tree(object):
     def __init__(self):
-        self.tree = []
-    def add_root(self, v, k):
-        self.tree.append(requirements_node(v, k, None, [], 0))
-    def get_root(self, k):
-        for root in self.tree:
-            if root.key == k: return root
+        self.roots = []
+        self._parent, self._level, self._number, self._cost, self._value = [], [], [], [], []
+        self._dep_src, self._dep_dst = [], []
+
+    def __len__(self):
+        return len(self._parent)
+
+    def add_node(self, parent, level, number, cost, value):
+        """
+        Adding a node while generating the forest. Nodes must be added in pre-order.
+        :return: id of the node
+        """
+        i = len(self._parent)
+        if parent < 0:
+            self.roots.append(i)
+        self._parent.append(parent)
+        self._level.append(level)
+        self._number.append(number)
+        self._cost.append(cost)
+        self._value.append(value)
+        return i
+
+    def add_dependency(self, dep_node, req_node):
+        self._dep_src.append(dep_node)
+        self._dep_dst.append(req_node)
+
+    def build(self):
+        """Freezing the nodes into arrays. Called once all nodes are added"""
+        n = len(self._parent)
+        self.parent = np.array(self._parent, dtype=int)
+        self.level = np.array(self._level, dtype=int)
+        self.number = np.array(self._number, dtype=int)
+        self.cost = np.array(self._cost, dtype=float)
+        self.value = np.array(self._value, dtype=float)
+        self.done = np.zeros(n, dtype=bool)
+        self.visible = np.zeros(n, dtype=bool)
+
+        # key code: (level, number of the parent, number)
+        pnumber = np.where(self.parent >= 0, self.number[self.parent], 0)
+        self.key = self.level * 1000000 + pnumber * 1000 + self.number
+
+        # key -> first node (in pre-order) with this key. lookup[i]: the node found by the key of node i
+        keys, first, inverse = np.unique(self.key, return_index=True, return_inverse=True)
+        self.key_index = dict(zip(keys.tolist(), first.tolist()))
+        self.lookup = first[inverse]
+
+        self.child_ptr, self.child_idx = _csr(self.parent, n)
+        # deepest level under each root. 0 if the root has no child
+        self.depth = np.maximum.reduceat(self.level, self.roots) if n else np.zeros(0, dtype=int)
+
+    def copy(self):
+        """
+        Cloning a built forest, before any dependency. The structure arrays are shared (they never change), costs and
+        values are copied, and no node is done nor visible
+        """
+        other = requirements_forest.__new__(requirements_forest)
+        other.__dict__.update(self.__dict__)
+        other.roots = list(self.roots)
+        other._dep_src, other._dep_dst = [], []
+        other.cost, other.value = self.cost.copy(), self.value.copy()
+        other.done = np.zeros(len(self), dtype=bool)
+        other.visible = np.zeros(len(self), dtype=bool)
+        return other
+
+    def build_dependencies(self):
+        """Freezing the dependencies into CSR. Called once all dependencies are added"""
+        self.dep_ptr, self.dep_idx = _csr(np.array(self._dep_src, dtype=int), len(self),
+                                          np.array(self._dep_dst, dtype=int))
+
+    def track(self, owner, available):
+        """
+        Starting the readiness tracking
+        :param owner: np.array. team index of every node
+        :param available: one container (with add, update and discard) of available tasks per team
+        """
+        n = len(self)
+        self.owner = owner
+        self.pending = self.count_not_done(np.arange(n))
+        # nodes whose readiness depends on node m: looked_idx[looked_ptr[m]:looked_ptr[m + 1]]
+        self.looked_ptr, self.looked_idx = _csr(self.lookup, n)
+        self.available = available
+        self._make_available(np.flatnonzero(self.visible & ~self.done & (self.pending[self.lookup] == 0)))
+
+    def _make_available(self, ids):
+        owners = self.owner[ids]
+        for t in np.unique(owners).tolist():
+            self.available[t].update(ids[owners == t].tolist())
+
+    def reveal(self, ids):
+        """making the nodes ids visible"""
+        new = ids[~self.visible[ids]]
+        if len(new) == 0: return
+        self.visible[new] = True
+        self._make_available(new[~self.done[new] & (self.pending[self.lookup[new]] == 0)])
+
+    def complete(self, i):
+        """marking node i as done"""
+        self.done[i] = True
+        self.available[self.owner[i]].discard(i)
+        p = self.parent[i]
+        if p >= 0:
+            self.pending[p] -= 1
+            if self.pending[p] == 0:
+                for j in self.looked_idx[self.looked_ptr[p]:self.looked_ptr[p + 1]].tolist():
+                    if self.visible[j] and not self.done[j]:
+                        self.available[self.owner[j]].add(j)
+
+    def children(self, i):
+        return self.child_idx[self.child_ptr[i]:self.child_ptr[i + 1]]
+
+    def dependencies(self, i):
+        return self.dep_idx[self.dep_ptr[i]:self.dep_ptr[i + 1]]
+
     def find_node(self, k):
-        for root in self.tree:
-            if root.key == k: return root
-            else:
-                result = root.iterative_search(k)
-                if result: return result
-    
-    def get_level(self, root, level):
-        list = []
-        if (root.level < level):
-            for child in root.children:
-                list.append(self.get_level(child, level))
-        elif (root.level == level):
-            list.append(root.key)
-        return list
-    
-    def traverse(self):
-        list = []
-        for root in self.tree:
-            list.append(root)
-            to_add = root.traverse()
-            for i in to_add:
-                list.append(i)
-        return list
-    
+        """first node (in pre-order) whose key code is k. See key_str"""
+        return self.key_index.get(k)
+
+    def count_not_done(self, i):
+        """number of unfinished children of node(s) i"""
+        return np.bincount(self.parent[~self.done & (self.parent >= 0)], minlength=len(self))[i]
+
+    def key_str(self, i):
+        """the requirement key of node i, as a string"""
+        if self.parent[i] < 0:
+            return 'Base Req #' + str('%.3d' % self.number[i])
+        parent = self.parent[i]
+        return ("+" * self.level[i] + 'Child-' + ('B' if self.parent[parent] < 0 else '+') +
+                str('%.3d' % self.number[parent]) + ' #' + str('%.3d' % self.number[i]))
+
     def show(self):
-        for root in self.tree:
-            root.show()
\ No newline at end of file
+        for i in range(len(self)):
+            print(" " * self.level[i] + "{Key: " + self.key_str(i) + ", Cost: " + str(self.cost[i]) + ", Value: " +
+                  str(self.value[i]) + ", Done? " + str(self.done[i]) + "}")
+
+
+def _csr(src, n, dst=None):
+    """
+    Edges src -> dst (dst = edge position if not set) grouped by src, keeping their order
+    :return: ptr, idx. edges of i are idx[ptr[i]:ptr[i + 1]]
+    """
+    keep = src >= 0
+    order = np.flatnonzero(keep)[np.argsort(src[keep], kind='stable')]
+    ptr = np.zeros(n + 1, dtype=int)
+    np.cumsum(np.bincount(src[keep], minlength=n), out=ptr[1:])
+    return ptr, (order if dst is None else dst[order])
@@ -26,14 +26,18 @@
 
 """
 
-import math, random
+import random
+
+import numpy as np
 
 MAX_VALUE = 1500
 
 class Team(object):
-    def __init__(self, decisions):
+    def __init__(self, decisions, heap, rng=np.random):
         
         self.decisions = decisions
+        self.heap = heap  # requirements_forest holding the tasks
+        self.rng = rng  # discovery and value drift draws (np.random or np.random.Generator)
         
         self.team_size = decisions.team_size
         self.plan = decisions.plan
@@ -45,21 +49,25 @@ class Team(object):
         self.numAvailableTasks = 0
         self.numCompletedTasks = 0
         self.budget = 0
-        self.tasks = []
+        self.tasks = np.zeros(0, dtype=int)  # node ids
+        self.revealed = 0  # tasks[:revealed] are visible (watermark of markTasksVisible)
+        self.index = 0  # position in pom3_teams.teams
+        self.queue = PlanQueue(heap, self.plan)  # available tasks
         
     def calcTotalCost(self):
-        total = 0
-        for task in self.tasks:
-            total+= task.val.cost
-        return total
+        return seqSum(self.heap.cost[self.tasks])
     
     def setPolicy(self, policyInt):
         self.plan = policyInt
+        self.queue.plan = policyInt
+        self.queue.rekey()
         
     def markTasksVisible(self):
         if (self.visible > 1.0): self.visible = 1.0
-        for i in range((int)(self.visible*len(self.tasks))):
-            self.tasks[i].val.visible = True
+        k = (int)(self.visible*len(self.tasks))
+        if k > self.revealed:
+            self.heap.reveal(self.tasks[self.revealed:k])
+            self.revealed = k
             
         
         
@@ -68,14 +76,9 @@ class Team(object):
         team.budget += (totalCost/numShuffles)
         
     def collectAvailableTasks(team, requirements):
-        team.availableTasks = []
-        for task in team.tasks:
-            if task.val.visible == True:
-                #if no dependencies and no children on this task, then add to availableTasks list
-                if countNotDones(requirements.heap.find_node(task.key).children) == 0:
-                    if task.val.done == False:
-                        team.availableTasks.append(task)
-        team.numAvailableTasks += len(team.availableTasks)
+        #visible, not done, and no unfinished children on the node found by the task key
+        #team.queue is kept up to date by heap.reveal/heap.complete
+        team.numAvailableTasks += len(team.queue)
         
     
     def applySortingStrategy(team):
@@ -87,35 +90,98 @@ class Team(object):
         #method 4: Cost/Value Ascending
         #method 5: Cost/Value Descending
         
-        if team.plan == 0:   team.availableTasks.sort(key=lambda cv: cv.val.cost)
-        elif team.plan == 1: team.availableTasks.sort(key=lambda cv: cv.val.cost, reverse=True)
-        elif team.plan == 2: team.availableTasks.sort(key=lambda cv: cv.val.value)
-        elif team.plan == 3: team.availableTasks.sort(key=lambda cv: cv.val.value, reverse=True)
-        elif team.plan == 4: team.availableTasks.sort(key=lambda cv: cv.val.cost/cv.val.value)
-        elif team.plan == 5: team.availableTasks.sort(key=lambda cv: cv.val.cost/cv.val.value, reverse=True)
+        #team.queue is ordered by the plan. only the value based keys change (in updateTasks)
+        if team.queue.stale: team.queue.rekey()
     
     def executeAvailableTasks(team): 
-        for task in team.availableTasks:
-            if (team.budget - task.val.cost) >= 0:
-                team.budget -= task.val.cost
-                team.cost_total  += task.val.cost
-                team.value_total += task.val.value
-                task.val.done = True
+        heap = team.heap
+        tasks = team.queue.ordered()
+        if len(tasks) == 0: return
+        costs = heap.cost[tasks]
+        least = np.minimum.accumulate(costs[::-1])[::-1]  #cheapest task from here on
+        for task, cost, value, floor in zip(tasks.tolist(), costs.tolist(), heap.value[tasks].tolist(), least.tolist()):
+            if team.budget < floor: break  #the budget is exhausted, nothing left fits
+            if (team.budget - cost) >= 0:
+                team.budget -= cost
+                team.cost_total  += cost
+                team.value_total += value
+                heap.complete(task)
                 team.numCompletedTasks += 1
                 
     def discoverNewTasks(team):
-        team.visible += nextTime(team.decisions.dynamism/10.0)
+        team.visible += nextTime(team.decisions.dynamism/10.0, team.rng)
         team.markTasksVisible()
 
     def updateTasks(team):
         #Adjust values
-        for task in team.tasks:
-            change = (random.uniform(0, team.decisions.dynamism) - team.decisions.dynamism/2)*team.decisions.culture/100.0
-            task.val.value += (MAX_VALUE * max(0,change))  
-
-def nextTime(rateParameter): return -math.log(1.0 - random.random()) / rateParameter                        
-def countNotDones(list):
-    cnt = 0
-    for i in list:
-        if i.val.done == False: cnt+= 1
-    return cnt
\ No newline at end of file
+        dynamism = team.decisions.dynamism
+        changes = (team.rng.uniform(0, dynamism, len(team.tasks)) - dynamism/2)*team.decisions.culture/100.0
+        team.heap.value[team.tasks] += MAX_VALUE * np.maximum(0, changes)
+        team.queue.stale = team.plan in PlanQueue.VALUE_PLANS
+
+class PlanQueue(object):
+    """
+    Available tasks of a team, kept ordered by the sorting strategy of the plan. Ties are broken by task order, as the
+    former stable sorts. New tasks are merged in (the keys of the others stay), done tasks are dropped lazily.
+    Only the value based keys change, all at once in updateTasks (see rekey).
+    """
+    VALUE_PLANS = (2, 3, 4, 5)
+
+    def __init__(self, heap, plan):
+        self.heap = heap
+        self.plan = plan
+        self.ids = np.zeros(0, dtype=int)  # ordered
+        self.key = np.zeros(0)
+        self.pending = []  # added, not merged yet
+        self.count = 0
+        self.stale = False  # the value based keys are out of date
+
+    def __len__(self):
+        return self.count
+
+    def keys(self, ids):
+        cost, value = self.heap.cost[ids], self.heap.value[ids]
+        if self.plan == 0:   return cost
+        elif self.plan == 1: return -cost
+        elif self.plan == 2: return value
+        elif self.plan == 3: return -value
+        elif self.plan == 4: return cost/value
+        elif self.plan == 5: return -(cost/value)
+        else: return np.zeros(len(ids))
+
+    def add(self, i):
+        self.pending.append(i)
+        self.count += 1
+
+    def update(self, ids):
+        self.pending.extend(ids)
+        self.count += len(ids)
+
+    def discard(self, i):
+        self.count -= 1
+
+    def _sort(self, ids, key):
+        order = np.lexsort((ids, key))
+        self.ids, self.key = ids[order], key[order]
+
+    def ordered(self):
+        """:return: the available tasks in order"""
+        alive = ~self.heap.done[self.ids]
+        if self.pending:
+            new = np.array(self.pending, dtype=int)
+            self.pending = []
+            self._sort(np.concatenate([self.ids[alive], new]), np.concatenate([self.key[alive], self.keys(new)]))
+        elif not alive.all():
+            self.ids, self.key = self.ids[alive], self.key[alive]
+        return self.ids
+
+    def rekey(self):
+        """updating all keys at once"""
+        ids = self.ordered()
+        self._sort(ids, self.keys(ids))
+        self.stale = False
+
+def nextTime(rateParameter, rng=random): return -np.log(1.0 - rng.random()) / rateParameter                        
+def seqSum(a):
+    # left to right sum, as the += loops (np.sum adds pairwise)
+    return float(np.cumsum(a)[-1]) if len(a) else 0
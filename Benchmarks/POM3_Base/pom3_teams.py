@@ -27,11 +27,13 @@
 
 import math
 
+import numpy as np
+
 from Benchmarks.POM3_Base.pom3_team import *
 
 
 class pom3_teams:
-    def __init__(p3t, requirements, decisions):
+    def __init__(p3t, requirements, decisions, rng=np.random):
         p3t.teams = []
         p3t.decisions = decisions
 
@@ -39,7 +41,7 @@ class pom3_teams:
         total_size = 0
         while (total_size < requirements.count):
             # specific sized teams
-            p3t.teams.append(Team(decisions))
+            p3t.teams.append(Team(decisions, requirements.heap, rng))
             total_size += decisions.team_size
 
         # Assign Initial Tasks to Each Team
@@ -47,12 +49,18 @@ class pom3_teams:
         for team in p3t.teams:
             percent = (float)(team.team_size) / (float)(total_size)
             end = (int)(begin + math.ceil(percent * len(requirements.tasks)) - 1)
-            for k in range(begin, end):
-                team.tasks.append(requirements.tasks[k])
+            team.tasks = requirements.tasks[begin:end]
             begin = end
         if ((end) < len(requirements.tasks)):
-            for i in range(len(requirements.tasks) - (end)):
-                p3t.teams[len(p3t.teams) - 1].tasks.append(requirements.tasks[begin + i])
+            p3t.teams[len(p3t.teams) - 1].tasks = np.concatenate([p3t.teams[len(p3t.teams) - 1].tasks,
+                                                                   requirements.tasks[begin:]])
+
+        # Track the available tasks of each team
+        owner = np.zeros(len(requirements.tasks), dtype=int)
+        for i, team in enumerate(p3t.teams):
+            team.index = i
+            owner[team.tasks] = i
+        requirements.heap.track(owner, [team.queue for team in p3t.teams])
 
         # Mark Initial Visibility of Tasks for Each Team
         for team in p3t.teams:
@@ -62,6 +70,7 @@ class pom3_teams:
         scales_alpha = [0.45, 0.50, 0.55, 0.60, 0.65]
         scales_beta = [0.40, 0.30, 0.20, 0.10, 0.00]
         scales_gamma = [0.15, 0.20, 0.25, 0.30, 0.35]
+        cost = requirements.heap.cost
         for team in p3t.teams:
 
             numAlphas = scales_alpha[decisions.size] * team.team_size
@@ -73,12 +82,12 @@ class pom3_teams:
             team.gamma = numGammas
             team.power = team.alpha + 1.22 * team.beta + 1.6 * team.gamma
 
-            for task in team.tasks:
-                task.val.cost += task.val.cost * ((numAlphas + 1.22 * numBetas + 1.6 * numGammas) / 100.0)
+            cost[team.tasks] += cost[team.tasks] * ((numAlphas + 1.22 * numBetas + 1.6 * numGammas) / 100.0)
 
-                # and apply effect of criticality while we're at it
-                task.val.cost = task.val.cost * (
-                team.decisions.criticality_modifier ** team.decisions.criticality)  # cost' = cost * X^criticality
+            # and apply effect of criticality while we're at it
+            cost[team.tasks] = cost[team.tasks] * (
+            team.decisions.criticality_modifier ** team.decisions.criticality)  # cost' = cost * X^criticality
+            team.queue.rekey()  # the costs changed
 
         # Print Out of Teams & Requirements
         """  
@@ -21,11 +21,17 @@
 #  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 #  THE SOFTWARE.
 
+import random
 import re
 
+import numpy as np
 from deap import base, creator
 
-sign = lambda x: '1' if x > 0 else '0'
+from Benchmarks.SPL_Base.dimacs import load_dimacs
+from Benchmarks.SPL_Base.incremental import IncrementalEvaluator
+from Benchmarks.SPL_Base.packed import PackedIndividual, stack, unpack
+from Benchmarks.SPL_Base.spl_batch import CompiledCNF, to_matrix
+from Benchmarks.SPL_Base.walksat import walksat
 
 
 def load_product_url(fm_name):
@@ -78,25 +84,22 @@ def load_product_url(fm_name):
 class DimacsModel:
     def __init__(self, fm_name):
         self.name = fm_name
-        _, self.featureNum, self.cnfs, self.cnfNum = load_product_url(fm_name)
-
-        self.cost = []
-        self.used_before = []
-        self.defects = []
-
-        filen = 'Benchmarks/dimacs/' + fm_name + '.dimacs.augment'
-        lines = open(filen, 'r').read().split('\n')[1:]
-
-        lines = map(lambda x: x.rstrip(), lines)
-        for l in lines:
-            if not len(l): continue
-            _, a, b, c = l.split(" ")
-            self.cost.append(float(a))
-            self.used_before.append(bool(int(b)))
-            self.defects.append(int(c))
-
-        creator.create("FitnessMin_" + fm_name, base.Fitness, weights=[-1.0] * 5, vioconindex=list())
-        creator.create("Individual_" + fm_name, str, fitness=getattr(creator, "FitnessMin_" + fm_name))
+        # compiled once into a binary cache, memory mapped. See SPL_Base/dimacs.py
+        self.fm = load_dimacs(fm_name)
+        self.featureNum, self.cnfNum = self.fm.featureNum, self.fm.cnfNum
+        self._cnfs = None
+        self.cnf = None  # CompiledCNF, built on first evaluation
+
+        self.cost = self.fm.cost
+        self.used_before = self.fm.used_before
+        self.defects = self.fm.defects
+
+        if not hasattr(creator, "FitnessMin_" + fm_name):
+            creator.create("FitnessMin_" + fm_name, base.Fitness, weights=[-1.0] * 5, vioconindex=list())
+        if not hasattr(creator, "Individual_" + fm_name):
+            # bit-packed configurations. See SPL_Base/packed.py
+            creator.create("Individual_" + fm_name, PackedIndividual,
+                           fitness=getattr(creator, "FitnessMin_" + fm_name))
 
         self.creator = creator
         self.Individual = getattr(creator, "Individual_" + fm_name)
@@ -104,6 +107,13 @@ class DimacsModel:
         toolbox = base.Toolbox()
         toolbox.register("evaluate", self.eval_ind)
 
+    @property
+    def cnfs(self):
+        """the clauses as lists of literals, built on first use"""
+        if self._cnfs is None:
+            self._cnfs = self.fm.clauses()
+        return self._cnfs
+
     def eval_ind(self, ind, normalized=True):
         """
         return the fitness, but it might be no needed.
@@ -114,39 +124,62 @@ class DimacsModel:
         :param normalized:
 
         """
-        convio = 0
-        ind.fitness.vioconindex = []
-        for c_i, c in enumerate(self.cnfs):
-            corr = False
-            for x in c:
-                if sign(x) == ind[abs(x) - 1]:
-                    corr = True
-                    break
-            if not corr:
-                ind.fitness.vioconindex.append(c_i)
-                convio += 1
-
-        unselected, unused, defect, cost = 0, 0, 0, 0
-        for i, selected in enumerate(map(int, ind)):
-            if not selected:
-                unselected += 1
-            else:
-                cost += self.cost[i]
-                if self.used_before[i]:
-                    defect += self.defects[i]
-                else:
-                    unused += 1
-        if normalized:
-            ind.fitness.values = (convio / self.cnfNum,
-                                  unselected / self.featureNum,
-                                  unused / self.featureNum,
-                                  defect / sum(self.defects),
-                                  cost / sum(self.cost))
-        else:
-            ind.fitness.values = (convio, unselected, unused, defect, cost)
-
+        self.eval_pop([ind], normalized)
         return ind.fitness.values
 
+    def eval_pop(self, pop, normalized=True):
+        """
+        Evaluating a population in one batch. See SPL_Base/spl_batch.py
+        Sets the fitness values and the violated clause indices (fitness.vioconindex) of every individual
+        :param pop: list of individuals (or of '0'/'1' strings with a fitness)
+        :return: np.array (len(pop), 5) objectives: violations, unselected, unused, defects, cost
+        """
+        if self.cnf is None:
+            self.cnf = CompiledCNF(self.fm)
+        words = stack(pop) if len(pop) and isinstance(pop[0], PackedIndividual) else None
+        X = unpack(words, self.featureNum) if words is not None else to_matrix(pop)
+        violated = self.cnf.violated(X)
+        res = self.cnf.evaluate(X, normalized, violated=violated, words=words)
+        for ind, v, r in zip(pop, violated, res):
+            ind.fitness.vioconindex = np.flatnonzero(v).tolist()
+            ind.fitness.values = tuple(r)
+        return res
+
+    def incremental(self, ind):
+        """
+        :param ind: individual, flipped in place by the evaluator
+        :return: IncrementalEvaluator of ind. See SPL_Base/incremental.py
+        """
+        if self.cnf is None:
+            self.cnf = CompiledCNF(self.fm)
+        return IncrementalEvaluator(self.cnf, ind)
+
+    def repair(self, ind, max_flips=1000, noise=0.5, rng=random, normalized=True):
+        """
+        Repairing ind in place with WalkSAT, e.g. after mutation. See SPL_Base/walksat.py
+        Sets its fitness (no need to evaluate it again). On large models (e.g. coreboot) the budget runs out with
+        hundreds of clauses still violated: ind is improved, not valid
+        :param max_flips: flip budget
+        :param noise: probability of a random walk step
+        :param rng: random.Random (or the random module)
+        :return: ind
+        """
+        ev = self.incremental(ind)
+        walksat(ev, max_flips, noise, rng)
+        ev.assign(normalized)
+        return ind
+
+    def seed_population(self, size, max_flips=1000, noise=0.5, rng=random, normalized=True):
+        """
+        :param size: number of individuals
+        :return: list of uniformly random individuals, repaired (see repair) and evaluated
+        """
+        pop = list()
+        for _ in range(size):
+            bits = format(rng.getrandbits(self.featureNum), '0%db' % self.featureNum)
+            pop.append(self.repair(self.Individual(bits), max_flips, noise, rng, normalized))
+        return pop
+
 
 if __name__ == '__main__':
     small = 'webportal'
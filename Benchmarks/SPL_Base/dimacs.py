@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2018, Jianfeng Chen <jchen37@ncsu.edu>
+# vim: set ts=4 sts=4 sw=4 expandtab smartindent:
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+
+"""
+Compiled feature models.
+A DIMACS feature model (Benchmarks/dimacs/<name>.dimacs, with the feature attributes in <name>.dimacs.augment) is
+parsed once into flat arrays, saved as .npy files under CACHE_DIR. Later loads memory map these files (read only), so
+that processes opening the same model share its pages.
+
+    clause_ptr, clause_lit  clauses in CSR. literals of clause c: clause_lit[clause_ptr[c]:clause_ptr[c + 1]]
+    cost, used_before, defects  one value per feature, in the order of the .augment lines
+    feature_names, featureNum, cnfNum
+
+The cache files are named after a hash of both sources: changing a source compiles a new cache, and drops the old one.
+"""
+
+from __future__ import division
+
+import glob
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+import numpy as np
+
+DIMACS_DIR = 'Benchmarks/dimacs/'
+CACHE_DIR = 'Benchmarks/dimacs/cache/'
+ARRAYS = ('clause_ptr', 'clause_lit', 'cost', 'used_before', 'defects')
+
+
+class feature_model(object):
+    def __init__(self, name, arrays, meta):
+        self.name = name
+        for a in ARRAYS:
+            setattr(self, a, arrays[a])
+        self.feature_names = meta['feature_names']
+        self.featureNum = meta['featureNum']
+        self.cnfNum = meta['cnfNum']
+
+    def clauses(self):
+        """:return: the clauses as lists of literals, as SPL.load_product_url"""
+        return [c.tolist() for c in np.split(np.asarray(self.clause_lit), self.clause_ptr[1:-1])]
+
+
+def _sources(fm_name, dimacs_dir):
+    return dimacs_dir + fm_name + '.dimacs', dimacs_dir + fm_name + '.dimacs.augment'
+
+
+def source_hash(fm_name, dimacs_dir=DIMACS_DIR):
+    h = hashlib.sha1()
+    for filen in _sources(fm_name, dimacs_dir):
+        with open(filen, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def parse_dimacs(fm_name, dimacs_dir=DIMACS_DIR):
+    """
+    Parsing the sources, as SPL.load_product_url and DimacsModel did
+    :return: dict of the ARRAYS, dict of the meta data (feature_names, featureNum, cnfNum)
+    """
+    dimacs, augment = _sources(fm_name, dimacs_dir)
+    lines = open(dimacs, 'r').read().split('\n')
+
+    names = dict()
+    for line in lines:
+        if line.startswith('c'):
+            m = re.match(r'c (\d+)\$? (\w+)', line)
+            names[int(m.group(1))] = m.group(2)
+    stat = [re.match(r'p cnf (\d+) (\d+)', line) for line in lines if line.startswith('p')][0]
+    featureNum, cnfNum = int(stat.group(1)), int(stat.group(2))
+    assert len(names) == featureNum, "There exists some features without any name"
+
+    # the clause lines, each ended by 0
+    body = ' '.join(line for line in lines if line.endswith('0') and not line.startswith(('c', 'p')))
+    nums = np.array(body.split(), dtype=np.int64)
+    ends = np.flatnonzero(nums == 0)
+    assert len(ends) == cnfNum, "Unmatched cnfNum."
+
+    rows = [l.rstrip().split(' ') for l in open(augment, 'r').read().split('\n')[1:] if len(l.rstrip())]
+    arrays = {
+        'clause_ptr': np.concatenate([[0], ends - np.arange(len(ends))]).astype(np.int64),
+        'clause_lit': nums[nums != 0].astype(np.int32),
+        'cost': np.array([float(r[1]) for r in rows]),
+        'used_before': np.array([bool(int(r[2])) for r in rows], dtype=bool),
+        'defects': np.array([int(r[3]) for r in rows], dtype=np.int64),
+    }
+    meta = {'feature_names': [names[i] for i in range(1, featureNum + 1)], 'featureNum': featureNum, 'cnfNum': cnfNum}
+    return arrays, meta
+
+
+def _write(path, write):
+    """writing a cache file atomically, as concurrent processes may compile the same model"""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'wb' if path.endswith('.npy') else 'w') as f:
+        write(f)
+    umask = os.umask(0)  # mkstemp creates the file with mode 0600, giving it the mode of a plainly created file
+    os.umask(umask)
+    os.chmod(tmp, 0o666 & ~umask)
+    os.replace(tmp, path)
+
+
+def compile_dimacs(fm_name, dimacs_dir=DIMACS_DIR, cache_dir=CACHE_DIR):
+    """
+    Parsing the model and saving its cache, in place of any former one
+    :return: prefix of the cache files
+    """
+    prefix = os.path.join(cache_dir, '%s.%s.' % (fm_name, source_hash(fm_name, dimacs_dir)))
+    arrays, meta = parse_dimacs(fm_name, dimacs_dir)
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir, exist_ok=True)
+    for stale in glob.glob(os.path.join(cache_dir, fm_name + '.*')):
+        if not stale.startswith(prefix):
+            os.remove(stale)
+    for a in ARRAYS:
+        _write(prefix + a + '.npy', lambda f: np.save(f, arrays[a]))
+    _write(prefix + 'json', lambda f: json.dump(meta, f))  # last, marks the cache complete
+    return prefix
+
+
+def load_dimacs(fm_name, dimacs_dir=DIMACS_DIR, cache_dir=CACHE_DIR, mmap=True):
+    """
+    Loading a compiled feature model, compiling it first if its cache is missing or out of date
+    :param fm_name: e.g. 'freebsd'
+    :param mmap: memory map the arrays (read only). Otherwise they are read into memory
+    :return: feature_model
+    """
+    prefix = os.path.join(cache_dir, '%s.%s.' % (fm_name, source_hash(fm_name, dimacs_dir)))
+    if not os.path.exists(prefix + 'json'):
+        prefix = compile_dimacs(fm_name, dimacs_dir, cache_dir)
+    arrays = {a: np.load(prefix + a + '.npy', mmap_mode='r' if mmap else None) for a in ARRAYS}
+    with open(prefix + 'json', 'r') as f:
+        meta = json.load(f)
+    return feature_model(fm_name, arrays, meta)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2018, Jianfeng Chen <jchen37@ncsu.edu>
+# vim: set ts=4 sts=4 sw=4 expandtab smartindent:
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+
+"""
+Incremental evaluation of one SPL configuration under feature flips, for local search.
+The evaluator keeps the number of true literals of every clause, and the totals of the objectives. Flipping feature j
+only visits the clauses where j occurs (CompiledCNF.occurrences), and moves the totals by the attributes of j.
+"""
+
+from __future__ import division
+
+import numpy as np
+
+
+class IncrementalEvaluator(object):
+    def __init__(self, cnf, ind):
+        """
+        :param cnf: CompiledCNF
+        :param ind: PackedIndividual. flipped in place along with the evaluator
+        """
+        self.cnf = cnf
+        self.ind = ind
+        self.ptr, self.clauses, self.coefs = cnf.occurrences()
+        self.x = np.array(ind.bits(), dtype=np.int8)
+        self.refresh()
+
+    def refresh(self):
+        """recomputing everything from the configuration (e.g. to drop the rounding of the cost deltas)"""
+        cnf, X = self.cnf, self.x[None, :]
+        self.sat = cnf.satisfied(X)[:, 0].astype(np.int32)
+        totals = cnf.evaluate(X, normalized=False)[0]
+        self.violations = int(totals[0])
+        self.selected = cnf.featureNum - int(totals[1])
+        self.unused, self.defects, self.cost = int(totals[2]), int(totals[3]), totals[4]
+
+    def _touch(self, j):
+        """:return: clauses of feature j, and the change of their true literals if j is flipped"""
+        s, e = self.ptr[j], self.ptr[j + 1]
+        d = 1 - 2 * int(self.x[j])  # +1 selecting, -1 unselecting
+        return self.clauses[s:e], self.coefs[s:e] * d, d
+
+    def gain(self, j):
+        """:return: change of the number of violated clauses if feature j were flipped"""
+        rows, delta, _ = self._touch(j)
+        before = self.sat[rows]
+        return int(np.count_nonzero(before + delta == 0)) - int(np.count_nonzero(before == 0))
+
+    def breaks(self, js):
+        """
+        :param js: np.array of features
+        :return: np.array, for every feature of js, number of satisfied clauses it would violate if flipped
+        """
+        js = np.asarray(js, dtype=np.int64)
+        start, size = self.ptr[js], self.ptr[js + 1] - self.ptr[js]
+        owner = np.repeat(np.arange(len(js)), size)
+        at = np.arange(size.sum()) + np.repeat(start - np.cumsum(size) + size, size)
+        before = self.sat[self.clauses[at]]
+        after = before + self.coefs[at] * np.repeat(1 - 2 * self.x[js].astype(np.int32), size)
+        return np.bincount(owner, weights=(before > 0) & (after == 0), minlength=len(js)).astype(int)
+
+    def flip(self, j):
+        """
+        flipping feature j, in the individual too
+        :return: clauses violated by the flip, clauses satisfied by the flip
+        """
+        rows, delta, d = self._touch(j)
+        before = self.sat[rows]
+        after = before + delta
+        self.sat[rows] = after
+        broken, fixed = rows[(after == 0) & (before != 0)], rows[(before == 0) & (after != 0)]
+        self.violations += len(broken) - len(fixed)
+
+        cnf = self.cnf
+        self.x[j] += d
+        self.selected += d
+        if cnf.used_before[j]:
+            self.defects += d * int(cnf.defects[j])
+        else:
+            self.unused += d
+        self.cost += d * cnf.cost[j]
+        self.ind.flip(j)
+        return broken, fixed
+
+    def violated(self):
+        """:return: indices of the violated clauses"""
+        return np.flatnonzero(self.sat == 0)
+
+    def objectives(self, normalized=True):
+        """:return: np.array (5,), as spl_batch.OBJECTIVES. the cost carries the rounding of its deltas, see refresh"""
+        res = np.array([self.violations, self.cnf.featureNum - self.selected, self.unused, self.defects, self.cost],
+                       dtype=float)
+        return res / self.cnf.bounds if normalized else res
+
+    def assign(self, normalized=True):
+        """setting the fitness of the individual, as DimacsModel.eval_pop"""
+        self.ind.fitness.vioconindex = self.violated().tolist()
+        self.ind.fitness.values = tuple(self.objectives(normalized))
+        return self.ind.fitness.values
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2018, Jianfeng Chen <jchen37@ncsu.edu>
+# vim: set ts=4 sts=4 sw=4 expandtab smartindent:
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+
+"""
+Bit-packed SPL configurations.
+Feature i is bit i % 64 of the uint64 word i // 64. The padding bits of the last word are always 0, so that equal
+configurations have equal words, and popcounts need no mask.
+"""
+
+from __future__ import division
+
+import numpy as np
+
+WORD = 64
+_POPCOUNT8 = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+_BIT = [np.uint64(1) << np.uint64(b) for b in range(WORD)]
+
+
+def num_words(n):
+    return (n + WORD - 1) // WORD
+
+
+def pack(bits):
+    """
+    :param bits: np.array (..., n) of 0/1
+    :return: np.array (..., num_words(n)) of uint64
+    """
+    bits = np.asarray(bits, dtype=bool)
+    n = bits.shape[-1]
+    pad = num_words(n) * WORD - n
+    if pad:
+        bits = np.concatenate([bits, np.zeros(bits.shape[:-1] + (pad,), dtype=bool)], axis=-1)
+    return np.packbits(bits, axis=-1, bitorder='little').view('<u8')
+
+
+def unpack(words, n):
+    """
+    :param words: np.array (..., num_words(n)) of uint64
+    :return: np.array (..., n) of uint8 0/1
+    """
+    words = np.ascontiguousarray(words, dtype='<u8')
+    return np.unpackbits(words.view(np.uint8), axis=-1, bitorder='little')[..., :n]
+
+
+def popcount(words):
+    """:return: number of set bits over the last axis"""
+    words = np.ascontiguousarray(words, dtype='<u8')
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    return _POPCOUNT8[words.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+class PackedIndividual(object):
+    """
+    A configuration of n features in uint64 words (1 bit per feature).
+    Built from a '0'/'1' string, a 0/1 sequence, or words (with n). str() gives back the '0'/'1' string.
+    Bits are read with ind[i] and changed in place with ind[i] = v or ind.flip(i). Individuals hash and compare by
+    their bits, so that they can key caches.
+    """
+
+    def __init__(self, bits=(), n=None, words=None):
+        if words is not None:
+            self.n = n
+            self.words = np.array(words, dtype='<u8')
+        else:
+            if isinstance(bits, str):
+                bits = np.frombuffer(bits.encode('ascii'), dtype=np.uint8) - ord('0')
+            bits = np.asarray(bits)
+            self.n = len(bits)
+            self.words = pack(bits)
+
+    def __len__(self):
+        return self.n
+
+    def _index(self, i):
+        """a single feature index, in range"""
+        if not -self.n <= i < self.n:
+            raise IndexError('feature index out of range')
+        return i % self.n
+
+    def _locate(self, i):
+        i = np.asarray(i, dtype=np.int64)
+        if np.any((i < -self.n) | (i >= self.n)):
+            raise IndexError('feature index out of range')
+        i = i % self.n
+        return i // WORD, (i % WORD).astype(np.uint64)
+
+    def __getitem__(self, i):
+        if isinstance(i, (int, np.integer)):
+            i = self._index(i)
+            return 1 if self.words[i // WORD] & _BIT[i % WORD] else 0
+        w, b = self._locate(i)
+        bit = (self.words[w] >> b) & np.uint64(1)
+        return int(bit) if bit.ndim == 0 else bit.astype(np.uint8)
+
+    def __setitem__(self, i, v):
+        if isinstance(i, (int, np.integer)):
+            i = self._index(i)
+            if v:
+                self.words[i // WORD] |= _BIT[i % WORD]
+            else:
+                self.words[i // WORD] &= ~_BIT[i % WORD]
+            return
+        w, b = self._locate(i)
+        mask = np.uint64(1) << b
+        if v:
+            np.bitwise_or.at(self.words, w, mask)
+        else:
+            np.bitwise_and.at(self.words, w, ~mask)
+
+    def flip(self, i):
+        """flipping feature(s) i in place. a repeated index flips as many times"""
+        if isinstance(i, (int, np.integer)):
+            i = self._index(i)
+            self.words[i // WORD] ^= _BIT[i % WORD]
+            return
+        w, b = self._locate(i)
+        np.bitwise_xor.at(self.words, w, np.uint64(1) << b)
+
+    def count(self):
+        """number of selected features"""
+        return int(popcount(self.words))
+
+    def bits(self):
+        """:return: np.array (n,) of uint8 0/1"""
+        return unpack(self.words, self.n)
+
+    def key(self):
+        """hashable bits"""
+        return self.words.tobytes()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __eq__(self, other):
+        return isinstance(other, PackedIndividual) and self.n == other.n and np.array_equal(self.words, other.words)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __str__(self):
+        return (self.bits() + ord('0')).tobytes().decode('ascii')
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, str(self))
+
+
+def stack(pop):
+    """:return: np.array (len(pop), words) of the words of PackedIndividuals"""
+    return np.stack([ind.words for ind in pop]) if len(pop) else np.zeros((0, 0), dtype='<u8')
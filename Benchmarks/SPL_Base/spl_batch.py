@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2018, Jianfeng Chen <jchen37@ncsu.edu>
+# vim: set ts=4 sts=4 sw=4 expandtab smartindent:
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+
+"""
+Batch evaluation of SPL configurations.
+The CNF is held as one sparse (clauses x features) literal matrix: +1 for a positive literal, -1 for a negative one.
+For a population X (configurations x features, 0/1), the number of true literals of every clause is
+    literals @ X.T + negatives
+(negatives: number of negative literals of the clause), and a clause is violated when it has none.
+The five objectives of DimacsModel.eval_ind then come from a few products over the whole population.
+"""
+
+from __future__ import division
+
+import numpy as np
+from scipy import sparse
+
+from Benchmarks.SPL_Base.packed import PackedIndividual, pack, popcount, stack, unpack
+
+OBJECTIVES = ('violations', 'unselected', 'unused', 'defects', 'cost')
+
+
+def to_matrix(pop):
+    """
+    :param pop: list of '0'/'1' strings, or of PackedIndividuals
+    :return: np.array (len(pop), features) of uint8 0/1
+    """
+    if len(pop) and isinstance(pop[0], PackedIndividual):
+        return unpack(stack(pop), len(pop[0]))
+    if len(pop) == 0:
+        return np.zeros((0, 0), dtype=np.uint8)
+    return (np.frombuffer(''.join(pop).encode('ascii'), dtype=np.uint8) - ord('0')).reshape(len(pop), -1)
+
+
+class CompiledCNF(object):
+    def __init__(self, fm, chunk_cells=1 << 24):
+        """
+        :param fm: feature_model, see dimacs.py
+        :param chunk_cells: bound of the (clauses x configurations) matrices, the population is split to fit in
+        """
+        self.featureNum, self.cnfNum = fm.featureNum, fm.cnfNum
+        lit, ptr = np.asarray(fm.clause_lit), np.asarray(fm.clause_ptr)
+        rows = np.repeat(np.arange(self.cnfNum), np.diff(ptr))
+        # duplicated literals add up, x and -x in one clause cancel out (the clause always holds)
+        self.literals = sparse.csr_matrix((np.sign(lit).astype(np.int32), (rows, np.abs(lit) - 1)),
+                                          shape=(self.cnfNum, self.featureNum))
+        self.negatives = np.bincount(rows[lit < 0], minlength=self.cnfNum).astype(np.int32)
+        self.chunk = max(1, chunk_cells // max(self.cnfNum, 1))
+        self._occurrences = None
+
+        self.cost = np.asarray(fm.cost, dtype=float)
+        self.used_before = np.asarray(fm.used_before, dtype=bool)
+        self.defects = np.asarray(fm.defects)
+        self.unused_mask = pack(~self.used_before)  # features never used before, as words
+        # left to right sums, as the former loops
+        self.bounds = np.array([self.cnfNum, self.featureNum, self.featureNum, float(np.cumsum(self.defects)[-1]),
+                                float(np.cumsum(self.cost)[-1])])
+
+    def occurrences(self):
+        """
+        Feature -> clause index (the literal matrix in CSC), built on first use
+        :return: ptr, clauses, coefs. clauses of feature j: clauses[ptr[j]:ptr[j + 1]], +1/-1 as its literals there
+        """
+        if self._occurrences is None:
+            csc = self.literals.tocsc()
+            csc.sum_duplicates()
+            self._occurrences = csc.indptr, csc.indices, csc.data
+        return self._occurrences
+
+    def satisfied(self, X):
+        """
+        :param X: np.array (configurations, features) 0/1
+        :return: np.array (clauses, configurations), number of true literals of every clause
+        """
+        return self.literals.dot(np.ascontiguousarray(X.T, dtype=np.int32)) + self.negatives[:, None]
+
+    def violated(self, X):
+        """:return: bool np.array (configurations, clauses)"""
+        out = np.zeros((X.shape[0], self.cnfNum), dtype=bool)
+        for s in range(0, X.shape[0], self.chunk):
+            out[s:s + self.chunk] = (self.satisfied(X[s:s + self.chunk]) == 0).T
+        return out
+
+    def violations(self, X):
+        """:return: np.array (configurations,), number of violated clauses"""
+        counts = np.zeros(X.shape[0], dtype=int)
+        for s in range(0, X.shape[0], self.chunk):
+            counts[s:s + self.chunk] = np.count_nonzero(self.satisfied(X[s:s + self.chunk]) == 0, axis=0)
+        return counts
+
+    def evaluate(self, X, normalized=True, violated=None, words=None):
+        """
+        :param X: np.array (configurations, features) 0/1
+        :param violated: violated(X), if already known
+        :param words: X packed (see packed.py), if known. the counts of selected features are then popcounts
+        :return: np.array (configurations, 5), objectives as OBJECTIVES
+        """
+        X = np.asarray(X, dtype=bool)
+        res = np.zeros((X.shape[0], len(OBJECTIVES)))
+        res[:, 0] = violated.sum(axis=1) if violated is not None else self.violations(X)
+        if words is not None:
+            res[:, 1] = self.featureNum - popcount(words)
+            res[:, 2] = popcount(words & self.unused_mask)
+        else:
+            res[:, 1] = self.featureNum - X.sum(axis=1)
+            res[:, 2] = (X & ~self.used_before).sum(axis=1)
+        res[:, 3] = (X & self.used_before).astype(np.int64).dot(self.defects)
+        res[:, 4] = X.dot(self.cost)
+        if normalized:
+            res /= self.bounds
+        return res
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2018, Jianfeng Chen <jchen37@ncsu.edu>
+# vim: set ts=4 sts=4 sw=4 expandtab smartindent:
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+
+"""
+WalkSAT (SKC) repair of SPL configurations, on the clauses of the feature model. No external solver.
+Until no clause is violated or the flip budget is spent: pick a violated clause at random, then flip one of its
+features, the one violating no satisfied clause if any; otherwise a random one with probability noise, else one
+violating the fewest satisfied clauses (ties at random).
+Used to seed valid (or nearly valid) populations, and to repair individuals after variation.
+Small models are repaired: from uniformly random configurations, webportal and eshop reach 0 violations, webportal
+within 40 flips, eshop within a few hundred, rarely over 1000 (see Perf/walksat_check.py). Large models are not:
+coreboot (12268 features) still violates about 400-500 clauses after 20000 flips. The budget then only lowers the
+violations, cheaper than evaluating them again.
+"""
+
+from __future__ import division
+
+import random
+
+import numpy as np
+
+
+class _violated_set(object):
+    """violated clauses, with O(1) add, remove and random pick"""
+
+    def __init__(self, clauses):
+        self.items = list(clauses)
+        self.at = dict((c, i) for i, c in enumerate(self.items))
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, c):
+        if c not in self.at:
+            self.at[c] = len(self.items)
+            self.items.append(c)
+
+    def remove(self, c):
+        i = self.at.pop(c, None)
+        if i is None: return
+        last = self.items.pop()
+        if i < len(self.items):
+            self.items[i] = last
+            self.at[last] = i
+
+    def pick(self, rng):
+        return self.items[rng.randrange(len(self.items))]
+
+
+def walksat(ev, max_flips=1000, noise=0.5, rng=random):
+    """
+    :param ev: IncrementalEvaluator, of the configuration to repair (changed in place)
+    :param max_flips: flip budget
+    :param noise: probability of a random walk step
+    :param rng: random.Random (or the random module)
+    :return: number of flips done. max_flips if clauses are still violated, as usual on large models
+    """
+    literals = ev.cnf.literals  # CSR: features of clause c: indices[indptr[c]:indptr[c + 1]]
+    violated = _violated_set(ev.violated().tolist())
+    flips = 0
+    while len(violated) and flips < max_flips:
+        c = violated.pick(rng)
+        features = literals.indices[literals.indptr[c]:literals.indptr[c + 1]]
+        breaks = ev.breaks(features)
+        best = np.flatnonzero(breaks == breaks.min())
+        if breaks.min() > 0 and rng.random() < noise:
+            j = features[rng.randrange(len(features))]
+        else:
+            j = features[best[rng.randrange(len(best))]]
+        broken, fixed = ev.flip(int(j))
+        for b in broken.tolist():
+            violated.add(b)
+        for f in fixed.tolist():
+            violated.remove(f)
+        flips += 1
+    return flips
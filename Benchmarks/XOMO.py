@@ -6,18 +6,25 @@ import numpy as np
 import pandas as pd
 from deap import creator, base
 
-from Benchmarks.XOMO_Base.xomo_liaison import xomol
+from Benchmarks.XOMO_Base.xomo_batch import CompiledCocomo, calibration_stream, to_ratings
 
 
 class XOMO(object):
-    def __init__(self, name, specific_bounds, obj_bound):
+    def __init__(self, name, specific_bounds, obj_bound, simulated_cost=None):
+        """
+        :param name:
+        :param specific_bounds:
+        :param obj_bound:
+        :param simulated_cost: Benchmarks.simulated_cost.SimulatedCost. synthetic latency paid per evaluation
+        """
         self.name = name
+        self.simulated_cost = simulated_cost
         # Should be as xomol.names to maintain order of LOWs and UPs
         names = ["aa", "sced", "cplx", "site", "resl", "acap", "etat", "rely",
                  "Data", "prec", "pmat", "aexp", "flex", "pcon", "tool", "time",
                  "stor", "docu", "b", "plex", "pcap", "kloc", "ltex", "pr",
                  "ruse", "team", "pvol"]
-        # Generic Bounds as per menzies.us/pdf/06xomo101.pdf fig.9
+        # Generic Bounds as per menzies.us/pdf/06xomo101.pdf fig.9. COCOMO II values, evaluated as ratings (to_ratings)
         common_bounds = {"aa"  : (1, 6),
                          "sced": (1.00, 1.43),
                          "cplx": (0.73, 1.74),
@@ -57,8 +64,18 @@ class XOMO(object):
             if min(val) == max(val):
                 self.bound[key] = (min(val), max(val) + 0.000001)  # avoid divide-by-zero error
 
+        self.lows = np.array([self.bound[n][0] for n in names])
+        self.ups = np.array([self.bound[n][1] for n in names])
+
         self.decNum = len(names)
         self.decs = names
+        self.cocomo = CompiledCocomo(names=names)
+
+        # Calibration random streams. If seed is set, the i-th evaluation in the run draws its calibrations from
+        # calibration_stream(seed, i). With crn (common random numbers), all evaluations share the stream 0.
+        self.seed = None
+        self.crn = False
+        self.evaluated = 0
         self.obj_bound = obj_bound
         self.objNum = 4
         self.objs = ['o' + str(i) + '_' for i in range(self.objNum)]
@@ -72,14 +89,11 @@ class XOMO(object):
             creator.create('Ind_xomo', array.array, typecode='d', fitness=creator.F4m)
 
     def _eval(self, df, index, normalized=True):
-        dind = []
-        for dn in self.decs:
-            m, M = self.bound[dn]
-            v = df.loc[index, dn]
-            dind.append(v * (M - m) + m)
-
-        xomoxo = xomol()
-        output = xomoxo.run(dind)
+        x = df.loc[index, self.decs].values.astype(float) * (self.ups - self.lows) + self.lows  # ordered as decs
+        x = to_ratings(x, self.decs)
+
+        rng = self._streams(1)
+        output = self.cocomo.xys(x, rng=rng if rng is np.random else rng[0])
         if not normalized:
             res = output
         else:
@@ -94,6 +108,9 @@ class XOMO(object):
         for i in range(self.objNum):
             df.loc[index, 'o%d_' % i] = round(res[i], 4)
 
+        if self.simulated_cost:
+            self.simulated_cost.pay(1)
+
     def init_random_pop(self, size, default_value=None):
         """ return a DataFrame
         Note: all objective were set as -1, an indicator of not assigned.
@@ -111,10 +128,66 @@ class XOMO(object):
 
         return df
 
-    def eval_pd_df(self, df, normalized=True, force_eval_all=False):
-        for ind in df.index:
-            if (not force_eval_all) and df.loc[ind, 'o0_'] != -1: continue
-            self._eval(df, ind, normalized=normalized)
+    def _normalize(self, output):
+        m, M = np.array(self.obj_bound, dtype=float).T
+        return np.where(output > M, 1, (output - m) / (M - m))
+
+    def _streams(self, n, indices=None):
+        """
+        :param n: number of evaluations
+        :param indices: evaluation indices. following the evaluation counter if not set
+        :return: random source(s) for CompiledCocomo.draw_calibrations
+        """
+        if indices is None:
+            indices = np.arange(self.evaluated, self.evaluated + n)
+        self.evaluated += n
+        if self.seed is None:
+            return np.random
+        if self.crn:
+            indices = np.zeros(n, dtype=int)
+        return [calibration_stream(self.seed, i) for i in indices]
+
+    def eval_pd_df(self, df, normalized=True, force_eval_all=False, indices=None, draws=1, quantiles=()):
+        """
+        Evaluating all (un-evaluated) configurations in one batch. See XOMO_Base/xomo_batch.py
+        Monte Carlo mode (draws > 1): every configuration is evaluated under draws sets of calibrations, in the same
+        batch. The objectives o*_ are then the means of the draws, and the quantiles are added as columns o<i>q<pct>.
+        e.g. quantiles=(0.1, 0.9) adds o0q10, o0q90, o1q10, ...
+        :param df: pd.DataFrame from init_random_pop
+        :param normalized:
+        :param force_eval_all: re-evaluate configurations whose o0_ is not -1
+        :param indices: evaluation indices of the configurations, only used when self.seed is set.
+                        pass them explicitly when splitting a batch across processes
+        :param draws: number of calibration draws per configuration
+        :param quantiles: quantiles of the draws to report. Monte Carlo mode only
+        :return:
+        """
+        todo = df.index if force_eval_all else df.index[df['o0_'] == -1]
+        if len(todo) == 0:
+            return
+
+        X = to_ratings(df.loc[todo, self.decs].values * (self.ups - self.lows) + self.lows, self.decs)
+        rng = self._streams(len(todo), indices)
+        if draws == 1:
+            res = self.cocomo.xys_batch(X, rng=rng)
+        else:
+            calibs = self.cocomo.draw_calibrations((len(todo), draws), rng)
+            res = self.cocomo.xys_batch(X[:, None, :], calibs=calibs)  # (configurations, draws, objectives)
+        if normalized:
+            res = self._normalize(res)
+
+        df[self.objs] = df[self.objs].astype(float)
+        if draws == 1:
+            df.loc[todo, self.objs] = np.round(res, 4)
+        else:
+            df.loc[todo, self.objs] = np.round(np.mean(res, axis=1), 4)
+            for q in quantiles:
+                qs = np.round(np.quantile(res, q, axis=1), 4)
+                for i in range(self.objNum):
+                    df.loc[todo, 'o%dq%g' % (i, q * 100)] = qs[:, i]
+
+        if self.simulated_cost:
+            self.simulated_cost.pay(len(todo) * draws)
 
     def pd_to_deap(self, pandas_df):
         """
@@ -256,15 +329,15 @@ bounds_flight = {"prec": (6.2, 1.24),
 objs_bound = [[0, 8e3], [0, 65], [0, 1.3e5], [0, 10]]
 
 
-def get_xomo(version):
+def get_xomo(version, simulated_cost=None):
     if version == 'osp':
-        return XOMO('osp', bounds_osp, objs_bound)
+        return XOMO('osp', bounds_osp, objs_bound, simulated_cost)
     if version == 'osp2':
-        return XOMO('osp2', bounds_osp2, objs_bound)
+        return XOMO('osp2', bounds_osp2, objs_bound, simulated_cost)
     if version == 'ground':
-        return XOMO('ground', bounds_ground, objs_bound)
+        return XOMO('ground', bounds_ground, objs_bound, simulated_cost)
     if version == 'flight':
-        return XOMO('flight', bounds_flight, objs_bound)
+        return XOMO('flight', bounds_flight, objs_bound, simulated_cost)
 
 
 if __name__ == '__main__':
@@ -357,91 +357,67 @@ class Model(X2Y):
 ##--SCED-RISK--##
 #################
 
-def totalRisk(project, risktable):
+def totalRisk(project, risktable=None):
+    """
+    Gathering and summing up all risk pairs at once.
+    :param project: dict of ratings, or np.array (..., len(RISK_ATTRS)) of ratings ordered as RISK_ATTRS
+    :param risktable: compiled risk table (see compileRisks). RISK_TABLE if not set
+    :return: float for a dict project, np.array (...) for a batch of projects
+    """
     _d = 3.73
-    return (sced_risk(project, risktable) +
-            prod_risk(project, risktable) +
-            pers_risk(project, risktable) +
-            proc_risk(project, risktable) +
-            plat_risk(project, risktable) +
-            reus_risk(project, risktable)) / _d
-
-
-def getRisk(a, b, project, risks):
-    if (a in project) and (b in project):
-        _aval = int(project[a])
-        _bval = int(project[b])
-        try:
-            _rt = risks[a, b]
-            _rt = _rt.split(",")  # split table
-            _rt = _rt[_bval - 1]  # grab line
-            _rt = _rt.split()  # split line
-            return float(_rt[_aval - 1])  # find index
-        except KeyError:
-            return 0
-    else:
-        return 0
-
-
-def sced_risk(proj, risks):
-    _a = 'sced'
-    return (sum(map(lambda x: getRisk(_a, x, proj, risks),
-                    str.split("rely time pvol tool acap "
-                              "aexp pcap plex ltex pmat"))))
-
-
-def prod_risk(proj, risks):
-    return (sum(map(lambda x_y: getRisk(x_y[0], x_y[1],
-                                        proj, risks),
-                    [("rely", "acap"), ("rely", "pcap"),
-                     ("cplx", "acap"), ("cplx", "pcap"),
-                     ("cplx", "tool"), ("rely", "pmat"),
-                     ("sced", "cplx"), ("sced", "rely"),
-                     ("sced", "time"), ("ruse", "aexp"),
-                     ("ruse", "ltex")])))
-
-
-def pers_risk(proj, risks):
-    return (sum(map(lambda x_y: getRisk(x_y[0], x_y[1],
-                                        proj, risks),
-                    [("pmat", "acap"), ("stor", "acap"),
-                     ("time", "acap"), ("tool", "acap"),
-                     ("tool", "pcap"), ("ruse", "aexp"),
-                     ("ruse", "ltex"), ("pmat", "pcap"),
-                     ("stor", "pcap"), ("time", "pcap"),
-                     ("ltex", "pcap"), ("pvol", "plex"),
-                     ("sced", "acap"), ("sced", "aexp"),
-                     ("sced", "pcap"), ("sced", "plex"),
-                     ("sced", "ltex"), ("rely", "acap"),
-                     ("rely", "pcap"), ("cplx", "acap"),
-                     ("cplx", "pcap"), ("team", "aexp")
-                     ])))
-
-
-def proc_risk(proj, risks):
-    return (sum(map(lambda x_y: getRisk(x_y[0], x_y[1],
-                                        proj, risks),
-                    [("tool", "pmat"), ("time", "tool"),
-                     ("team", "aexp"), ("team", "sced"),
-                     ("team", "site"), ("sced", "tool"),
-                     ("sced", "pmat"), ("cplx", "tool"),
-                     ("pmat", "acap"), ("tool", "acap"),
-                     ("tool", "pcap"), ("pmat", "pcap")
-                     ])))
-
-
-def plat_risk(proj, risks):
-    return (sum(map(lambda x_y: getRisk(x_y[0], x_y[1],
-                                        proj, risks),
-                    [("sced", "time"), ("sced", "pvol"),
-                     ("stor", "acap"), ("time", "acap"),
-                     ("stor", "pcap"), ("pvol", "plex"),
-                     ("time", "tool")])))
-
-
-def reus_risk(project, risktable):
-    return (getRisk('ruse', 'aexp', project, risktable) +
-            getRisk('ruse', 'ltex', project, risktable))
+    if risktable is None:
+        risktable = RISK_TABLE
+    elif isinstance(risktable, dict):  # raw tables filled by readRisks
+        risktable = compileRisks(risktable)
+
+    if isinstance(project, dict):
+        return float(totalRisk(np.array([project.get(k, np.nan) for k in RISK_ATTRS], dtype=float), risktable))
+
+    # as the former string tables, list[int(rating) - 1]. ratings out of the table (or missing) are no risk
+    ratings = np.asarray(project, dtype=float)
+    ratings = np.trunc(np.where(np.isfinite(ratings), ratings, -100)).astype(int) - 1
+    inside = (ratings >= -6) & (ratings < 6)
+    ratings %= 6
+
+    a, b = RISK_PAIRS
+    risks = risktable[a, b, ratings[..., b], ratings[..., a]]
+    return np.sum(np.where(inside[..., a] & inside[..., b], risks, 0), axis=-1) / _d
+
+
+SCED_RISK_PAIRS = [('sced', x) for x in str.split("rely time pvol tool acap "
+                                                   "aexp pcap plex ltex pmat")]
+PROD_RISK_PAIRS = [("rely", "acap"), ("rely", "pcap"),
+                   ("cplx", "acap"), ("cplx", "pcap"),
+                   ("cplx", "tool"), ("rely", "pmat"),
+                   ("sced", "cplx"), ("sced", "rely"),
+                   ("sced", "time"), ("ruse", "aexp"),
+                   ("ruse", "ltex")]
+PERS_RISK_PAIRS = [("pmat", "acap"), ("stor", "acap"),
+                   ("time", "acap"), ("tool", "acap"),
+                   ("tool", "pcap"), ("ruse", "aexp"),
+                   ("ruse", "ltex"), ("pmat", "pcap"),
+                   ("stor", "pcap"), ("time", "pcap"),
+                   ("ltex", "pcap"), ("pvol", "plex"),
+                   ("sced", "acap"), ("sced", "aexp"),
+                   ("sced", "pcap"), ("sced", "plex"),
+                   ("sced", "ltex"), ("rely", "acap"),
+                   ("rely", "pcap"), ("cplx", "acap"),
+                   ("cplx", "pcap"), ("team", "aexp")
+                   ]
+PROC_RISK_PAIRS = [("tool", "pmat"), ("time", "tool"),
+                   ("team", "aexp"), ("team", "sced"),
+                   ("team", "site"), ("sced", "tool"),
+                   ("sced", "pmat"), ("cplx", "tool"),
+                   ("pmat", "acap"), ("tool", "acap"),
+                   ("tool", "pcap"), ("pmat", "pcap")
+                   ]
+PLAT_RISK_PAIRS = [("sced", "time"), ("sced", "pvol"),
+                   ("stor", "acap"), ("time", "acap"),
+                   ("stor", "pcap"), ("pvol", "plex"),
+                   ("time", "tool")]
+REUS_RISK_PAIRS = [('ruse', 'aexp'), ('ruse', 'ltex')]
+ALL_RISK_PAIRS = (SCED_RISK_PAIRS + PROD_RISK_PAIRS + PERS_RISK_PAIRS +
+                  PROC_RISK_PAIRS + PLAT_RISK_PAIRS + REUS_RISK_PAIRS)
 
 
 #############
@@ -654,7 +630,38 @@ def readRisks(risktable):
 
 
 #############
-import math
+import numpy as np
+
+# all attributes taking part in the risk. RISK_TABLE is indexed by their positions
+RISK_ATTRS = sorted(set(a for pair in ALL_RISK_PAIRS for a in pair))
+
+
+def compileRisks(risktable):
+    """
+    Compiling the string tables into a dense array. Pairs queried several times in totalRisk are weighted accordingly
+    :param risktable: dict filled by readRisks
+    :return: np.array [a, b, bval - 1, aval - 1] where a, b are positions in RISK_ATTRS
+    """
+    _n = len(RISK_ATTRS)
+    compiled = np.zeros((_n, _n, 6, 6))
+    for a, b in ALL_RISK_PAIRS:
+        if (a, b) not in risktable: continue
+        _rt = [list(map(float, line.split())) for line in risktable[a, b].split(",")]
+        compiled[RISK_ATTRS.index(a), RISK_ATTRS.index(b)] += np.array(_rt)
+    return compiled
+
+
+def _readCompiledRisks():
+    rt = {}
+    readRisks(rt)
+    return compileRisks(rt)
+
+
+RISK_TABLE = _readCompiledRisks()
+# (a, b) positions of all queried pairs, gathered by totalRisk
+RISK_PAIRS = np.array(sorted(set((RISK_ATTRS.index(a), RISK_ATTRS.index(b)) for a, b in ALL_RISK_PAIRS))).T
+
+#############
 
 # CoQualMo Calibration Mods:
 DefectIntroReqsNeg = ['pmat', 'prec', 'resl', 'team',
@@ -713,7 +720,7 @@ class Cocomo(Model):
                                     _lo = _hi = int(line[2])
                                 _acc[_attr] = _lo, _hi
                     # Overwrite file constraints w/kwargs:
-                    kwargs = dict(_acc.items() + kwargs.items())
+                    kwargs = dict(list(_acc.items()) + list(kwargs.items()))
                     break
                 except:
                     print("Input file [", _a, "] not readable")
@@ -731,6 +738,26 @@ class Cocomo(Model):
                 o.bounds[str(_key)] = _lo, _hi
         # Parent init:
         super(o.__class__, o).__init__()
+        # Fixed order array representation, an alternative to the dicts of o.x(). See compiled and xys
+        o.names = list(o.all)
+        o._compiled = None
+
+    def indexMaps(o, names):
+        """
+        :param names: column order of the decision arrays
+        :return: positions of the scale factors, effort multipliers and defect removers in such arrays
+        """
+        col = {n: i for i, n in enumerate(names)}
+        return (np.array([col[i] for i in o.scaleFactors]),
+                np.array([col[i] for i in o.effortMultipliers]),
+                np.array([col[i] for i in o.defectRemovers]))
+
+    def compiled(o):
+        """array kernel of this model (xomo_batch.CompiledCocomo over o.names), built at first use"""
+        if o._compiled is None:
+            from Benchmarks.XOMO_Base.xomo_batch import CompiledCocomo
+            o._compiled = CompiledCocomo(o, o.names)
+        return o._compiled
 
     def say(o, x, a, b, kloc, sum, prod, exp,
             effort,  # o1\o2,o3,o4
@@ -767,8 +794,12 @@ class Cocomo(Model):
         if verbose: o.say(x, a, b, kloc, sum, prod, exp, effort)
         return x, effort
 
-    def xys(o, verbose=False, olist=False):
-        x = o.x()
+    def xys(o, verbose=False, olist=False, x=None):
+        if x is not None and not isinstance(x, dict):
+            # array ordered as o.names. evaluated by the compiled kernel, without any dict
+            _y = o.compiled().xys(x)
+            return _y if olist else tuple([x] + _y)
+        if x is None: x = o.x()
         a = x["b"]
         b = o.all["b"].y(a, reset=True)
         kloc = x["kloc"]
@@ -786,87 +817,51 @@ class Cocomo(Model):
         else:
             return x, effort, months, defects, risks
 
-    def trials(o, n=500, out="out.csv", verbose=True, write=False):
-        import csv
-        keys = []
-        _efforts = []
-        _months = []
-        _defects = []
-        _risks = []
-        _first = 0
-        rows = []
-        with open(out, 'w') as csv_file:
-            if write: csv_wri = csv.writer(csv_file)
-            for _i in range(0, n):
-                x = o.x()
-                if _i == 0:
-                    for _k, _ in x.iteritems():
-                        if _first == 0:
-                            keys.append('$' + str(_k))
-                            _first = 1
-                        else:
-                            keys.append('$' + str(_k))  # changed_nave
-                    keys.extend(["-effort", "-months",
-                                 "-defects", "-risks"])
-                    if write: csv_wri.writerows([keys])
-                a = x["b"]
-                b = o.all["b"].y(a, reset=True)
-                kloc = x["kloc"]
-                sum = o.sumSfs(x, reset=True)
-                prod = o.prodEms(x, reset=True)
-                exp = b + 0.01 * sum
-                effort = o.effort_calc(x, a, b, exp, sum, prod)
-                months = o.month_calc(x, effort, sum, prod)
-                defects = o.defect_calc(x)
-                risks = o.risk_calc(x)
-                _efforts.append(effort)
-                _months.append(months)
-                _defects.append(defects)
-                _risks.append(risks)
-                vals = []
-                for _, _v in x.iteritems():
-                    vals.append(_v)
-                vals.extend([effort, months, defects, risks])
-                if write: csv_wri.writerows([vals])
-                rows.append(vals)
+    def trials(o, n=500, out="out.csv.gz", verbose=True, write=False, chunk=10000):
+        """
+        Streaming the trials chunk by chunk (see xomo_batch.trials). Memory does not grow with n.
+        Changed from the former row by row version: out defaults to "out.csv.gz" (was "out.csv", now gzip
+        compressed), it is only created when write is set, and the trials are not kept in memory. The return is
+        (keys, stats) instead of (keys, rows), read the rows back from out if needed, e.g.
+            keys, stats = c.trials(n, out="out.csv.gz", write=True)
+            rows = pd.read_csv("out.csv.gz").values  # header: keys
+        :param n: number of trials
+        :param out: gzip compressed csv, written chunk by chunk
+        :param verbose: print means, standard deviations and quartiles
+        :param write: write the trials to out
+        :param chunk: trials per chunk
+        :return: keys (csv header), OnlineStats of effort, months, defects, risks
+        """
+        import gzip
+        import pandas as pd
+        from Benchmarks.XOMO_Base.xomo_batch import OnlineStats, trials
+
+        keys = ['$' + str(_k) for _k in o.all]
+        keys.extend(["-effort", "-months",
+                     "-defects", "-risks"])
+        stats = OnlineStats(4)
+        csv_file = gzip.open(out, 'wt', compresslevel=1) if write else None
+        if write: csv_file.write(','.join(keys) + '\n')
+        for x, y in trials(o, n=n, chunk=chunk):
+            stats.update(y)
+            if write: pd.DataFrame(np.hstack([x, y])).to_csv(csv_file, header=False, index=False)
+        if write: csv_file.close()
 
         if verbose:
-            _effSum = math.fsum(_efforts)
-            _mosSum = math.fsum(_months)
-            _defSum = math.fsum(_defects)
-            _rskSum = math.fsum(_risks)
-            _effMean = _effSum / n
-            _mosMean = _mosSum / n
-            _defMean = _defSum / n
-            _rskMean = _rskSum / n
-            _effSD = pow(math.fsum(map(lambda x: pow(x - _effMean, 2), _efforts)) / n, 0.5)
-            _mosSD = pow(math.fsum(map(lambda x: pow(x - _mosMean, 2), _months)) / n, 0.5)
-            _defSD = pow(math.fsum(map(lambda x: pow(x - _defMean, 2), _defects)) / n, 0.5)
-            _rskSD = pow(math.fsum(map(lambda x: pow(x - _rskMean, 2), _risks)) / n, 0.5)
-            _efforts.sort()
-            _months.sort()
-            _defects.sort()
-            _risks.sort()
+            _eff, _mos, _def, _rsk = zip(*stats.quantile([.25, .5, .75]))
             print("Means:")
-            print("\tEff:", _effMean, "\n\tMos:", _mosMean, "\n\tDef:", _defMean, "\n\tRsk:", _rskMean)
+            print("\tEff:", stats.mean[0], "\n\tMos:", stats.mean[1], "\n\tDef:", stats.mean[2], "\n\tRsk:",
+                  stats.mean[3])
             print("")
             print("Standard Deviations:")
-            print("\tEff:", _effSD, "\n\tMos:", _mosSD, "\n\tDef:", _defSD, "\n\tRsk:", _rskSD)
+            print("\tEff:", stats.sd[0], "\n\tMos:", stats.sd[1], "\n\tDef:", stats.sd[2], "\n\tRsk:", stats.sd[3])
             print("")
             print("Quartile Bounds (25/50/75):")
-            print("\tEff:", _efforts[int(.25 * n)], "\t", \
-                  _efforts[int(.5 * n)], "\t", \
-                  _efforts[int(.75 * n)], \
-                  "\n\tMos:", _months[int(.25 * n)], "\t", \
-                  _months[int(.5 * n)], "\t", \
-                  _months[int(.75 * n)], \
-                  "\n\tDef:", _defects[int(.25 * n)], "\t", \
-                  _defects[int(.5 * n)], "\t", \
-                  _defects[int(.75 * n)], \
-                  "\n\tRsk:", _risks[int(.25 * n)], "\t", \
-                  _risks[int(.5 * n)], "\t", \
-                  _risks[int(.75 * n)])
-        return keys, rows
+            print("\tEff:", "\t".join(map(str, _eff)),
+                  "\n\tMos:", "\t".join(map(str, _mos)),
+                  "\n\tDef:", "\t".join(map(str, _def)),
+                  "\n\tRsk:", "\t".join(map(str, _rsk)))
+        return keys, stats
 
     def about(o):
         def dr(what, lo=1, hi=6):
@@ -986,8 +981,6 @@ class Cocomo(Model):
     def defects(o, dtype, x):
         _ksloc = float(x["kloc"])
         _introduced = 0
-        import time
-        time.sleep(0.01)
         if (dtype == "requirements"):
             _introduced = (10 * _ksloc *
                            o.defectsIntroduced(dtype, x))
@@ -1087,9 +1080,7 @@ class Cocomo(Model):
         return _product
 
     def risk_calc(o, x):
-        rt = {}
-        readRisks(rt)
-        return totalRisk(x, rt)
+        return totalRisk(x)
 
 
 class Calibrations():
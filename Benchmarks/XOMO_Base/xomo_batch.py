@@ -0,0 +1,358 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2018, Jianfeng Chen <jchen37@ncsu.edu>
+# vim: set ts=4 sts=4 sw=4 expandtab smartindent:
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+
+"""
+Compiled COCOMO/COQUALMO engine.
+CompiledCocomo is built once from the structure of a Cocomo (which attributes are scale factors, effort multipliers
+or defect removers, and the slope of every calibration). It then evaluates one decision vector, or an (N, 27)
+matrix of them at once, with the same formulas as Cocomo.xys. Every evaluation resamples the calibrations exactly as
+a freshly built Cocomo does (B.y, Sf.m, Emp.m, Emn.m and Calib.m).
+
+All calibrations of one evaluation are stored as a flat vector of length calib_num.
+calib = calib_lo + U * (calib_hi - calib_lo), U ~ uniform(0, 1)
+
+For reproducible (and parallel-safe) runs, the U of evaluation i comes from its own stream calibration_stream(seed, i).
+Its objectives then depend only on (seed, i), no matter in which order, batch or process it is evaluated.
+"""
+
+from __future__ import division
+
+import numpy as np
+
+from Benchmarks.XOMO_Base.xomo import Cocomo, Sf, Emp, Emn, RISK_ATTRS, totalRisk
+
+# column order of the decision matrix. Same as xomol.names
+NAMES = ["aa", "sced", "cplx", "site", "resl", "acap", "etat", "rely",
+         "Data", "prec", "pmat", "aexp", "flex", "pcon", "tool", "time",
+         "stor", "docu", "b", "plex", "pcap", "kloc", "ltex", "pr",
+         "ruse", "team", "pvol"]
+
+# uniform ranges behind Sf.m, Emp.m, Emn.m and Calib.m
+SLOPE_RANGES = {Sf : (-0.972, -0.648),
+                Emp: (0.055, 0.15),
+                Emn: (-0.166, -0.075)}
+CALIB_RANGES = {('Intro', 'Reqs', 1)    : (0.0166, .38),
+                ('Intro', 'Reqs', -1)   : (-0.215, -0.035),
+                ('Intro', 'Design', 1)  : (0.0066, 0.145),
+                ('Intro', 'Design', -1) : (-0.325, -0.05),
+                ('Intro', 'Coding', 1)  : (0.0066, 0.145),
+                ('Intro', 'Coding', -1) : (-0.29, -0.05),
+                ('Removal', 'Reqs', 0)  : (0.0, 0.14),
+                ('Removal', 'Design', 0): (0.0, 0.156),
+                ('Removal', 'Coding', 0): (0.1, 0.176)}
+_PHASES = [('defectIntroReqs', 'defectRemovalReqs', 10),
+           ('defectIntroDesign', 'defectRemovalDesign', 20),
+           ('defectIntroCoding', 'defectRemovalCoding', 30)]
+_SCED_PERCENT = np.array([0, 75, 85, 100, 130, 160], dtype=float)
+
+# COCOMO II.2000 values of the ratings 1 (very low) to 6 (extra high), None where the rating is not defined.
+# The XOMO model bounds (menzies.us/pdf/06xomo101.pdf fig.9) are such values, Cocomo.xys works on the ratings
+COCOMO_VALUES = {"prec": (6.20, 4.96, 3.72, 2.48, 1.24, 0.00),
+                 "flex": (5.07, 4.05, 3.04, 2.03, 1.01, 0.00),
+                 "resl": (7.07, 5.65, 4.24, 2.83, 1.41, 0.00),
+                 "team": (5.48, 4.38, 3.29, 2.19, 1.10, 0.00),
+                 "pmat": (7.80, 6.24, 4.68, 3.12, 1.56, 0.00),
+                 "rely": (0.82, 0.92, 1.00, 1.10, 1.26, None),
+                 "Data": (None, 0.90, 1.00, 1.14, 1.28, None),
+                 "cplx": (0.73, 0.87, 1.00, 1.17, 1.34, 1.74),
+                 "ruse": (None, 0.95, 1.00, 1.07, 1.15, 1.24),
+                 "docu": (0.81, 0.91, 1.00, 1.11, 1.23, None),
+                 "time": (None, None, 1.00, 1.11, 1.29, 1.63),
+                 "stor": (None, None, 1.00, 1.05, 1.17, 1.46),
+                 "pvol": (None, 0.87, 1.00, 1.15, 1.30, None),
+                 "acap": (1.42, 1.19, 1.00, 0.85, 0.71, None),
+                 "pcap": (1.34, 1.15, 1.00, 0.88, 0.76, None),
+                 "pcon": (1.29, 1.12, 1.00, 0.90, 0.81, None),
+                 "aexp": (1.22, 1.10, 1.00, 0.88, 0.81, None),
+                 "plex": (1.19, 1.09, 1.00, 0.91, 0.85, None),
+                 "ltex": (1.20, 1.09, 1.00, 0.91, 0.84, None),
+                 "tool": (1.17, 1.09, 1.00, 0.90, 0.78, None),
+                 "site": (1.22, 1.09, 1.00, 0.93, 0.86, 0.80),
+                 "sced": (1.43, 1.14, 1.00, None, None, None)}  # high and very high are 1.00 too, nominal is kept
+
+
+def _rating_scale(values):
+    """:return: (values, ratings) increasing in values, for np.interp"""
+    points = sorted((v, r) for r, v in enumerate(values, 1) if v is not None)
+    return np.array([v for v, _ in points]), np.array([r for _, r in points], dtype=float)
+
+
+_RATING_SCALES = {n: _rating_scale(v) for n, v in COCOMO_VALUES.items()}
+
+
+def to_ratings(X, names=NAMES):
+    """
+    Mapping decisions given as COCOMO II values to ratings, the inputs of xys and xys_batch
+    Linear between the ratings of the table, clipped to its ends. kloc, b and the defect removers are kept
+    :param X: np.array (..., len(names)) of scale factor and effort multiplier values
+    :param names: column order of X
+    :return: np.array, X in ratings
+    """
+    X = np.array(X, dtype=float)
+    for i, n in enumerate(names):
+        if n in _RATING_SCALES:
+            X[..., i] = np.interp(X[..., i], *_RATING_SCALES[n])
+    return X
+
+
+def calibration_stream(seed, index):
+    """
+    Independent random stream of one evaluation
+    :param seed: run seed
+    :param index: evaluation (configuration) index in the run
+    :return: np.random.Generator
+    """
+    return np.random.Generator(np.random.PCG64(np.random.SeedSequence(seed, spawn_key=(int(index),))))
+
+
+def _calib_range(calib):
+    return CALIB_RANGES.get((calib.phase, calib.category, calib.sign), (0, 0))  # ignored attributes keep slope 0
+
+
+class CompiledCocomo(object):
+    def __init__(self, cocomo=None, names=NAMES):
+        """
+        :param cocomo: the Cocomo to compile. a default one if not set
+        :param names: column order of the decision vectors
+        """
+        cocomo = cocomo or Cocomo()
+        col = {n: i for i, n in enumerate(names)}
+        intro_keys = cocomo.scaleFactors + cocomo.effortMultipliers
+
+        # attribute indices
+        self.decNum = len(names)
+        self.sf, self.em, self.dr = cocomo.indexMaps(names)
+        self.intro = np.concatenate([self.sf, self.em])
+        self.risk = np.array([col[i] for i in RISK_ATTRS])
+        self.b, self.kloc, self.sced = col['b'], col['kloc'], col['sced']
+        self.sced_in_em = cocomo.effortMultipliers.index('sced')
+        self.phase_weights = np.array([w for _, _, w in _PHASES], dtype=float)
+
+        # calibration distributions. [B.rval, sf slopes, em slopes, intro slopes by phase, removal slopes by phase]
+        ranges = [(0, 1)]
+        ranges += [SLOPE_RANGES[type(cocomo.all[i])] for i in cocomo.scaleFactors + cocomo.effortMultipliers]
+        for intro, _, _ in _PHASES:
+            ranges += [_calib_range(getattr(cocomo.all[i].calibs, intro)) for i in intro_keys]
+        for _, removal, _ in _PHASES:
+            ranges += [_calib_range(getattr(cocomo.all[i].calibs, removal)) for i in cocomo.defectRemovers]
+        self.calib_lo, self.calib_hi = np.array(ranges, dtype=float).T
+        self.calib_span = self.calib_hi - self.calib_lo
+        self.calib_num = len(ranges)
+
+        n_sf, n_em, n_intro, n_dr = len(self.sf), len(self.em), len(self.intro), len(self.dr)
+        self.c_sf = slice(1, 1 + n_sf)
+        self.c_em = slice(self.c_sf.stop, self.c_sf.stop + n_em)
+        self.c_intro = slice(self.c_em.stop, self.c_em.stop + 3 * n_intro)
+        self.c_dr = slice(self.c_intro.stop, self.c_intro.stop + 3 * n_dr)
+
+        # work buffers of the single vector evaluation
+        self._calib = np.empty(self.calib_num)
+        self._sf = np.empty(n_sf)
+        self._em = np.empty(n_em)
+        self._intro = np.empty((3, n_intro))
+        self._intro_idx = np.tile(self.intro, (3, 1))
+        self._dr = np.empty((3, n_dr))
+        self._dr_idx = np.tile(self.dr, (3, 1))
+        self._risk = np.empty(len(self.risk))
+
+    def draw_calibrations(self, shape, rng=np.random):
+        """
+        :param shape: int or tuple. leading dimensions of the calibrations
+        :param rng: np.random module or np.random.Generator,
+                    or a list of streams (see calibration_stream), one per row along the first dimension
+        :return: np.array with shape (*shape, calib_num)
+        """
+        if np.ndim(shape) == 0:
+            shape = (shape,)
+        shape = tuple(shape) + (self.calib_num,)
+        if isinstance(rng, (list, tuple)):
+            assert len(rng) == shape[0], "Need one stream per row"
+            U = np.array([r.random(shape[1:]) for r in rng]).reshape(shape)
+        else:
+            U = rng.random(shape)
+        return self.calib_lo + U * self.calib_span
+
+    def xys(self, x, calib=None, rng=np.random):
+        """
+        Evaluating one decision vector, reusing the work buffers
+        :param x: decisions, ordered as names
+        :param calib: calibrations. draw a new set if not set
+        :param rng: random source for calib
+        :return: [effort, months, defects, risks]
+        """
+        x = np.asarray(x, dtype=float)
+        c = self._calib
+        if calib is None:
+            if isinstance(rng, np.random.Generator):
+                rng.random(out=c)
+            else:
+                c[:] = rng.random(self.calib_num)
+            c *= self.calib_span
+            c += self.calib_lo
+        else:
+            c[:] = calib
+
+        a, kloc = x[self.b], x[self.kloc]
+        b = -0.036 * a + 1.1 - 0.1 * c[0] - 0.05
+
+        np.take(x, self.sf, out=self._sf)
+        self._sf -= 6
+        self._sf *= c[self.c_sf]
+        sum_sf = self._sf.sum()
+
+        np.take(x, self.em, out=self._em)
+        self._em -= 3
+        self._em *= c[self.c_em]
+        self._em += 1
+        prod = self._em.prod()
+
+        sced = int(x[self.sced])
+        sced_percent = _SCED_PERCENT[sced] if 1 <= sced <= 5 else 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            effort = a * kloc ** (b + 0.01 * sum_sf) * prod
+            months = 3.67 * (effort / self._em[self.sced_in_em]) ** (0.28 + 0.2 * 0.01 * sum_sf) * (
+                    sced_percent / 100.0)
+
+        intro = self._intro
+        np.take(x, self._intro_idx, out=intro)
+        intro -= 3
+        intro *= c[self.c_intro].reshape(intro.shape)
+        intro += 1
+        dr = self._dr
+        np.take(x, self._dr_idx, out=dr)
+        dr -= 1
+        dr *= c[self.c_dr].reshape(dr.shape)
+        np.subtract(1, dr, out=dr)
+        defects = kloc * np.dot(self.phase_weights, intro.prod(axis=1) * dr.prod(axis=1))
+
+        np.take(x, self.risk, out=self._risk)
+        risks = totalRisk(self._risk)
+        return [float(effort), float(months), float(defects), float(risks)]
+
+    def xys_batch(self, X, calibs=None, rng=np.random):
+        """
+        Batch version of xys
+        :param X: np.array (..., decNum) decisions
+        :param calibs: np.array (..., calib_num). draw (one set per row) if not set
+        :param rng: random source for calibs. see draw_calibrations
+        :return: np.array (..., 4) efforts, months, defects, risks. X and calibs are broadcast against each other
+        """
+        X = np.asarray(X, dtype=float)
+        if calibs is None:
+            calibs = self.draw_calibrations(X.shape[:-1], rng)
+
+        a = X[..., self.b]
+        kloc = X[..., self.kloc]
+        b = -0.036 * a + 1.1 - 0.1 * calibs[..., 0] - 0.05
+        sum_sf = np.sum(calibs[..., self.c_sf] * (X[..., self.sf] - 6), axis=-1)
+        em = calibs[..., self.c_em] * (X[..., self.em] - 3) + 1
+        prod = np.prod(em, axis=-1)
+        exp = b + 0.01 * sum_sf
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            effort = a * kloc ** exp * prod
+
+            sced = np.trunc(X[..., self.sced]).astype(int)
+            sced_percent = np.where((sced >= 1) & (sced <= 5), _SCED_PERCENT[np.clip(sced, 0, 5)], 0)
+            months = 3.67 * (effort / em[..., self.sced_in_em]) ** (0.28 + 0.2 * 0.01 * sum_sf) * (
+                    sced_percent / 100.0)
+
+        intro = calibs[..., self.c_intro].reshape(calibs.shape[:-1] + (3, len(self.intro)))
+        introduced = np.prod(intro * (X[..., None, self.intro] - 3) + 1, axis=-1)
+        removal = calibs[..., self.c_dr].reshape(calibs.shape[:-1] + (3, len(self.dr)))
+        removed = np.prod(1 - removal * (X[..., None, self.dr] - 1), axis=-1)
+        defects = kloc * np.sum(self.phase_weights * introduced * removed, axis=-1)
+
+        risks = totalRisk(X[..., self.risk])
+        return np.stack(np.broadcast_arrays(effort, months, defects, risks), axis=-1)
+
+
+class OnlineStats(object):
+    """
+    Running statistics of a stream of (n, width) chunks, at constant memory.
+    mean and sd are merged chunk by chunk (Chan et al.). Quantiles come from a uniform reservoir sample of the stream.
+    """
+
+    def __init__(self, width, reservoir=10000, rng=np.random):
+        self.n = 0
+        self._mean = np.zeros(width)
+        self._m2 = np.zeros(width)
+        self.reservoir = np.empty((reservoir, width))
+        self.rng = rng
+
+    def update(self, Y):
+        Y = np.asarray(Y, dtype=float)
+        m = Y.shape[0]
+        if m == 0:
+            return
+
+        mean, m2 = Y.mean(axis=0), ((Y - Y.mean(axis=0)) ** 2).sum(axis=0)
+        delta = mean - self._mean
+        total = self.n + m
+        self._m2 += m2 + delta ** 2 * self.n * m / total
+        self._mean += delta * m / total
+
+        # reservoir sampling (algorithm R), one chunk at once
+        size = self.reservoir.shape[0]
+        fill = max(0, min(size - self.n, m))
+        self.reservoir[self.n:self.n + fill] = Y[:fill]
+        if fill < m:
+            seen = np.arange(self.n + fill, total) + 1
+            slots = (self.rng.random(m - fill) * seen).astype(int)
+            keep = slots < size
+            self.reservoir[slots[keep]] = Y[fill:][keep]
+        self.n = total
+
+    @property
+    def mean(self):
+        return self._mean
+
+    @property
+    def sd(self):
+        return np.sqrt(self._m2 / max(self.n, 1))
+
+    def quantile(self, q):
+        return np.quantile(self.reservoir[:min(self.n, self.reservoir.shape[0])], q, axis=0)
+
+
+def trials(cocomo=None, n=500, chunk=10000, rng=np.random):
+    """
+    Streaming version of the Cocomo.trials sampling. Decisions are drawn uniformly in the ranges of cocomo (as Cocomo.x)
+    :param cocomo: a Cocomo. a default one if not set
+    :param n: number of trials
+    :param chunk: number of trials per yielded chunk
+    :param rng: np.random module or np.random.Generator
+    :return: generator of (X, Y). X decisions ordered as cocomo.all, Y efforts, months, defects, risks
+    """
+    cocomo = cocomo or Cocomo()
+    names = cocomo.names
+    compiled = cocomo.compiled()
+    lo = np.array([cocomo.all[k].min for k in names], dtype=float)
+    hi = np.array([cocomo.all[k].max for k in names], dtype=float)
+
+    done = 0
+    while done < n:
+        m = min(chunk, n - done)
+        X = lo + rng.random((m, len(names))) * (hi - lo)
+        yield X, compiled.xys_batch(X, rng=rng)
+        done += m
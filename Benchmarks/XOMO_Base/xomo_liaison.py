@@ -1,17 +1,20 @@
 from Benchmarks.XOMO_Base.xomo import *
+from Benchmarks.XOMO_Base.xomo_batch import CompiledCocomo, NAMES, to_ratings
 
 
 class xomol:
+    names = NAMES
+
+    def __init__(self):
+        # compiled once, reused by every run
+        self.cocomo = CompiledCocomo()
+
     def run(self, input):
-        names = ["aa", "sced", "cplx", "site", "resl", "acap", "etat", "rely",
-                 "Data", "prec", "pmat", "aexp", "flex", "pcon", "tool", "time",
-                 "stor", "docu", "b", "plex", "pcap", "kloc", "ltex", "pr",
-                 "ruse", "team", "pvol"]
-        model = "flight"
-        # c = Cocomo("./Problems/XOMO/Data" + "/" + model)
-        c = Cocomo(input)
-        out = c.xys(verbose=False, olist=True)
-        return out
+        """
+        :param input: decisions ordered as names, COCOMO II values as the model bounds (see xomo_batch.to_ratings)
+        :return: [effort, months, defects, risks]
+        """
+        return self.cocomo.xys(to_ratings(input))
 
 
 if __name__ == '__main__':
@@ -44,5 +47,4 @@ if __name__ == '__main__':
               "team": (1.01, 5.48),
               "pvol": (0.87, 1.30)}
 
-    print
-    xomoxo.run(bounds)
+    print(xomoxo.run([bounds[n][0] for n in xomol.names]))
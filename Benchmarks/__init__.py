@@ -21,3 +21,31 @@
 #  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 #  THE SOFTWARE.
 
+
+"""
+Lazy model registry. A model module is imported (and the model constructed) only when asked for by name.
+"""
+
+import importlib
+
+# name -> (module, factory). factory(name) returns the model
+MODELS = {
+    'p3a'   : ('Benchmarks.POM3', 'get_pom3'),
+    'p3b'   : ('Benchmarks.POM3', 'get_pom3'),
+    'p3c'   : ('Benchmarks.POM3', 'get_pom3'),
+    'osp'   : ('Benchmarks.XOMO', 'get_xomo'),
+    'osp2'  : ('Benchmarks.XOMO', 'get_xomo'),
+    'ground': ('Benchmarks.XOMO', 'get_xomo'),
+    'flight': ('Benchmarks.XOMO', 'get_xomo'),
+}
+
+
+def get_model(name, *args, **kwargs):
+    """
+    :param name: one of MODELS
+    :param args: extra arguments of the factory, e.g. simulated_cost for XOMO models
+    :return: the model
+    """
+    assert name in MODELS, "Unknown model " + name
+    module, factory = MODELS[name]
+    return getattr(importlib.import_module(module), factory)(name, *args, **kwargs)
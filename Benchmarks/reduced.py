@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2018, Jianfeng Chen <jchen37@ncsu.edu>
+# vim: set ts=4 sts=4 sw=4 expandtab smartindent:
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+
+from __future__ import division
+
+import numpy as np
+import pandas as pd
+
+
+class ReducedModel(object):
+    def __init__(self, model, active, baseline=0.5):
+        """
+        Reduced-dimension view of a model. Only the active decisions are searched, the inert ones are fixed.
+        Same interface as the models, so that NSGAII and RIOT can run on it directly.
+        :param model: the full model
+        :param active: names of the active decisions (e.g. from Stats.sensitivity.screen)
+        :param baseline: normalized value of the inert decisions. a number, or a dict name -> value
+        """
+        self.model = model
+        self.name = model.name
+        self.decs = [d for d in model.decs if d in active]
+        self.inert = [d for d in model.decs if d not in active]
+        self.decNum = len(self.decs)
+        self.baseline = pd.Series(baseline if isinstance(baseline, dict) else {d: baseline for d in self.inert})
+        self.objNum = model.objNum
+        self.objs = model.objs
+        self.obj_bound = model.obj_bound
+        self.columns = self.decs + self.objs
+        # positions of the inert decisions in the full individuals, removed from the back
+        self._inert_pos = sorted([model.decs.index(d) for d in self.inert], reverse=True)
+
+    def expand(self, df):
+        """
+        :param df: pd.DataFrame with the active decisions
+        :return: pd.DataFrame of the full model, same index. inert decisions at their baseline
+        """
+        full = self.model.init_random_pop(df.shape[0])
+        full.index = df.index
+        for d in self.inert:
+            full[d] = self.baseline[d]
+        for c in df.columns:
+            full[c] = df[c]
+        return full
+
+    def init_random_pop(self, size, default_value=None):
+        """ return a DataFrame
+        Note: all objective were set as -1, an indicator of not assigned.
+        :param size: number of population
+        :param default_value: set all values as the same
+        :return: pd.DataFrame
+        """
+        if default_value is not None:
+            df = pd.DataFrame(data=np.ones([size, len(self.columns)]) * default_value, columns=self.columns)
+        else:
+            df = pd.DataFrame(data=np.random.rand(size, len(self.columns)), columns=self.columns)
+
+        for i in range(self.objNum):
+            df['o%d_' % i] = -1
+
+        return df
+
+    def eval_pd_df(self, df, normalized=True, force_eval_all=False, **kwargs):
+        """
+        Evaluating df on the full model. extra arguments (e.g. draws for XOMO) go to the full model
+        """
+        full = self.expand(df)
+        self.model.eval_pd_df(full, normalized=normalized, force_eval_all=force_eval_all, **kwargs)
+        for c in full.columns:
+            if c not in self.model.decs:
+                df[c] = full[c]
+
+    def pd_to_deap(self, pandas_df):
+        pop = self.model.pd_to_deap(self.expand(pandas_df))
+        for ind in pop:
+            for i in self._inert_pos:
+                del ind[i]
+        return pop
+
+    def deap_to_pd(self, pop):
+        """
+        Transfearring the DEAP population object to pandas obj
+        :param pop:
+        :return:
+        """
+        df = self.init_random_pop(len(pop))
+        for i, deap_con_obj in enumerate(pop):
+            for j, attr in enumerate(self.decs):
+                df.loc[i, attr] = deap_con_obj[j]
+            if deap_con_obj.fitness.valid:
+                for o in range(self.objNum):
+                    df.loc[i, 'o%d_' % o] = deap_con_obj.fitness.values[o]
+        return df
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2018, Jianfeng Chen <jchen37@ncsu.edu>
+# vim: set ts=4 sts=4 sw=4 expandtab smartindent:
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+
+"""
+Emulating an expensive simulator.
+The numeric kernels of the models are fast. To study the sample efficiency of active learning as if every evaluation
+took seconds on a real simulator, a model can pay a synthetic latency per evaluation, outside the kernel.
+Off by default. e.g.
+    model = get_xomo('osp', simulated_cost=SimulatedCost('constant', 0.03))
+"""
+
+import random
+import time
+
+
+class SimulatedCost(object):
+    def __init__(self, dist='constant', *params, seed=None):
+        """
+        :param dist: latency distribution of one evaluation, in seconds
+            'constant'    params = (seconds,)
+            'uniform'     params = (lo, hi)
+            'exponential' params = (mean,)
+            'lognormal'   params = (mu, sigma)
+        :param params: see dist
+        :param seed: seed of the latency draws. a dedicated stream, the global random module and the search
+            using it are not disturbed
+        """
+        self.rng = random.Random(seed)
+        samplers = {
+            'constant'   : lambda s: s,
+            'uniform'    : lambda lo, hi: self.rng.uniform(lo, hi),
+            'exponential': lambda mean: self.rng.expovariate(1.0 / mean),
+            'lognormal'  : lambda mu, sigma: self.rng.lognormvariate(mu, sigma),
+        }
+        assert dist in samplers, "Unknown latency distribution " + dist
+        self.dist = dist
+        self.params = params
+        self._sampler = samplers[dist]
+        self.paid = 0.0  # total synthetic latency, in seconds
+        self.evals = 0
+
+    def draw(self):
+        return max(0.0, self._sampler(*self.params))
+
+    def pay(self, evals=1):
+        """
+        Sleeping for the latencies of evals evaluations (as if they were executed one after another)
+        :param evals: number of evaluations just done
+        :return: the slept seconds
+        """
+        latency = sum(self.draw() for _ in range(evals))
+        time.sleep(latency)
+        self.paid += latency
+        self.evals += evals
+        return latency
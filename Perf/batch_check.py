@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2018, Jianfeng Chen <jchen37@ncsu.edu>
+# vim: set ts=4 sts=4 sw=4 expandtab smartindent:
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+
+"""
+Regression checks of the batch kernels against the serial code they replaced, on fixed random draws.
+ - XOMO: CompiledCocomo.xys_batch (and xys) against the dict based Cocomo.xys, with the calibrations fixed.
+   the risks against the former sum of the string risk tables, pair by pair (Cocomo.xys uses the compiled tables too)
+ - POM3: pom3_batch against pom3.simulate, one simulation at a time on the same streams. results are identical
+ - SPL: CompiledCNF.evaluate against the former clause by clause eval_ind, on webportal
+Usage (at the project root): python -m Perf.batch_check [configurations per check]
+"""
+
+from __future__ import division
+
+import random
+import sys
+from contextlib import contextmanager
+
+import numpy as np
+
+from Benchmarks.POM3 import get_pom3
+from Benchmarks.POM3_Base.pom3 import pom3, simulation_stream
+from Benchmarks.POM3_Base.pom3_batch import pom3_batch
+from Benchmarks.SPL import DimacsModel, load_product_url
+from Benchmarks.SPL_Base.spl_batch import to_matrix
+from Benchmarks.XOMO_Base.xomo import ALL_RISK_PAIRS, Cocomo, readRisks
+from Benchmarks.XOMO_Base.xomo_batch import NAMES, CompiledCocomo
+
+
+@contextmanager
+def _fixed_calibrations(u):
+    """the dict based Cocomo draws its calibrations from the random module: each draw at the fraction u of its range"""
+    uniform, rand = random.uniform, random.random
+    random.uniform, random.random = (lambda a, b: a + u * (b - a)), (lambda: u)
+    try:
+        yield
+    finally:
+        random.uniform, random.random = uniform, rand
+
+
+def _legacy_risk(project, risktable):
+    """the former totalRisk and getRisk: every pair of the six risk categories (some pairs are in several)"""
+    total = 0
+    for a, b in ALL_RISK_PAIRS:
+        if (a, b) not in risktable: continue
+        try:
+            total += float(risktable[a, b].split(",")[int(project[b]) - 1].split()[int(project[a]) - 1])
+        except IndexError:  # rating out of the table
+            pass
+    return total / 3.73
+
+
+def xomo_check(n=200, seed=0):
+    """
+    :param n: number of decision vectors, in rating space (0.5-6.5, kloc 2-1000, b 3-10)
+    :return: largest relative difference
+    """
+    rs = np.random.RandomState(seed)
+    X = rs.uniform(0.5, 6.5, (n, len(NAMES)))
+    X[:, NAMES.index('kloc')] = rs.uniform(2, 1000, n)
+    X[:, NAMES.index('b')] = rs.uniform(3, 10, n)
+    U = rs.uniform(0, 1, n)  # calibration fraction of every vector, 0 and 1 are the range bounds
+    U[:2] = 0, 1
+
+    compiled, risktable = CompiledCocomo(), {}
+    readRisks(risktable)
+    calibs = compiled.calib_lo + U[:, None] * compiled.calib_span
+    batch = compiled.xys_batch(X, calibs=calibs)
+    worst = 0
+    for x, u, calib, got in zip(X, U, calibs, batch):
+        with _fixed_calibrations(u):
+            # built under the fixed draws too, the defect slopes of Cocomo are drawn at construction
+            ref = np.array(Cocomo().xys(olist=True, x=dict(zip(NAMES, x))))
+        ref[3] = _legacy_risk(dict(zip(NAMES, x)), risktable)
+        for y in (got, compiled.xys(x, calib=calib)):
+            rel = np.abs(ref - y) / np.maximum(np.abs(ref), 1e-12)
+            worst = max(worst, np.max(rel))
+    assert worst < 1e-9, "XOMO batch differs from Cocomo.xys (relative %g)" % worst
+    return worst
+
+
+def pom3_check(n=200, seed=0):
+    """
+    :param n: number of configurations, drawn in the bounds of p3a, p3b and p3c
+    :return: number of configurations checked
+    """
+    rs = np.random.RandomState(seed)
+    inputs = list()
+    for version in ('p3a', 'p3b', 'p3c'):
+        model = get_pom3(version)
+        inputs += (rs.rand(n // 3 + 1, len(model.decs)) * (model.ups - model.lows) + model.lows).tolist()
+    inputs = inputs[:n]
+    ref = [pom3().simulate(x, simulation_stream(seed, i)) for i, x in enumerate(inputs)]
+    got = pom3_batch().simulate(inputs, [simulation_stream(seed, i) for i in range(len(inputs))])
+    diff = [i for i, (a, b) in enumerate(zip(ref, got)) if a != b]
+    assert not diff, "POM3 batch differs from pom3.simulate on %s, e.g. %s" % (diff, inputs[diff[0]])
+    return len(inputs)
+
+
+def _legacy_eval(cnfs, augment, bits):
+    """the former DimacsModel.eval_ind, on the .dimacs and .augment text. :return: objectives (not normalized)"""
+    violated = [c_i for c_i, c in enumerate(cnfs) if not any(('1' if x > 0 else '0') == bits[abs(x) - 1] for x in c)]
+    unselected, unused, defect, cost = 0, 0, 0, 0
+    for selected, (c, used, d) in zip(map(int, bits), augment):
+        if not selected:
+            unselected += 1
+        else:
+            cost += c
+            if used:
+                defect += d
+            else:
+                unused += 1
+    return violated, (len(violated), unselected, unused, defect, cost)
+
+
+def spl_check(n=200, seed=0, fm_name='webportal'):
+    """
+    :param n: number of configurations. uniformly random, plus all and none selected
+    :return: number of configurations checked
+    """
+    model = DimacsModel(fm_name)
+    _, _, cnfs, _ = load_product_url(fm_name)
+    with open('Benchmarks/dimacs/' + fm_name + '.dimacs.augment') as f:
+        augment = [(float(a), bool(int(b)), int(c)) for _, a, b, c in
+                   (l.split(' ') for l in f.read().split('\n')[1:] if l.strip())]
+    rng = random.Random(seed)
+    pop = ['0' * model.featureNum, '1' * model.featureNum]
+    pop += [format(rng.getrandbits(model.featureNum), '0%db' % model.featureNum) for _ in range(n - 2)]
+
+    model.eval_pop([model.Individual(b) for b in pop[:1]])  # compiles the clauses
+    X = to_matrix(pop)
+    raw, violated = model.cnf.evaluate(X, normalized=False), model.cnf.violated(X)
+    norm = model.cnf.evaluate(X)
+    bounds = (model.cnfNum, model.featureNum, model.featureNum, sum(d for _, _, d in augment),
+              sum(c for c, _, _ in augment))
+    for bits, r, nr, v in zip(pop, raw, norm, violated):
+        ref_violated, ref = _legacy_eval(cnfs, augment, bits)
+        assert np.flatnonzero(v).tolist() == ref_violated, "SPL violated clauses differ on " + bits
+        assert np.allclose(r, ref), "SPL objectives differ on %s: %s, former %s" % (bits, r, ref)
+        assert np.allclose(nr, np.array(ref) / bounds), "SPL normalized objectives differ on " + bits
+    return len(pop)
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print('XOMO  xys_batch = Cocomo.xys, largest relative difference %.1e' % xomo_check(n))
+    print('POM3  pom3_batch = pom3.simulate on %d configurations' % pom3_check(n))
+    print('SPL   CompiledCNF.evaluate = former eval_ind on %d webportal configurations' % spl_check(n))
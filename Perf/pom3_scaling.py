@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2018, Jianfeng Chen <jchen37@ncsu.edu>
+# vim: set ts=4 sts=4 sw=4 expandtab smartindent:
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+
+"""
+Scaling benchmark of the POM3 simulator over its Size decision (0-4, i.e. 7 to 750 base requirements).
+Other decisions are fixed at the middle of the p3a bounds, the plan and the seeds vary.
+Usage (at the project root): python -m Perf.pom3_scaling [simulations per size]
+"""
+
+from __future__ import division
+
+import random
+import sys
+import time
+
+from Benchmarks.POM3_Base.pom3 import pom3, pom3_decisions
+from Benchmarks.POM3_Base.pom3_requirements import pom3_requirements
+from Benchmarks.POM3_Base.pom3_teams import pom3_teams
+
+
+def config(size, plan):
+    return [0.5, 1.01, 6, 0.55, 50, 25, size, plan, 22]
+
+
+def pom3_scaling(size, sims=12):
+    """
+    :param size: POM3 Size decision
+    :param sims: number of simulations
+    :return: mean nodes, mean teams, mean seconds per simulation
+    """
+    nodes = teams = 0
+    for i in range(sims):
+        random.seed(i)
+        decisions = pom3_decisions(config(size, i % 6))
+        requirements = pom3_requirements(decisions)
+        nodes += len(requirements.heap)
+        teams += len(pom3_teams(requirements, decisions).teams)
+
+    startat = time.time()
+    for i in range(sims):
+        random.seed(i)
+        pom3().simulate(config(size, i % 6))
+    return nodes / sims, teams / sims, (time.time() - startat) / sims
+
+
+if __name__ == '__main__':
+    sims = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    print('%-5s %8s %8s %12s' % ('size', 'nodes', 'teams', 'ms/sim'))
+    for size in range(5):
+        nodes, teams, sec = pom3_scaling(size, sims)
+        print('%-5d %8.0f %8.1f %12.2f' % (size, nodes, teams, sec * 1000))
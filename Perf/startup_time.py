@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2018, Jianfeng Chen <jchen37@ncsu.edu>
+# vim: set ts=4 sts=4 sw=4 expandtab smartindent:
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+
+"""
+Startup-time benchmark of the CLI.
+Every job of a sweep (repeats x models x methods) pays the interpreter start, the imports and the model construction
+once. This script times these in fresh interpreters:
+    lazy  -- import main, then build the one model of the job through the registry
+    eager -- what main.py used to do: import both algorithms and all models, then build all seven models
+Usage (at the project root): python -m Perf.startup_time [repeats]
+"""
+
+import subprocess
+import sys
+import time
+
+from Benchmarks import MODELS
+
+LAZY = "import main; main._get_model_for_name('{model}')"
+EAGER = ("from Algorithms.NSGAII import nsgaii\n"
+         "from Algorithms.div_conv import riot\n"
+         "from Benchmarks.POM3 import get_pom3\n"
+         "from Benchmarks.XOMO import get_xomo\n"
+         "from Stats.statsReporting import write_results_to_txt\n"
+         "[get_pom3(m) for m in ['p3a', 'p3b', 'p3c']]\n"
+         "[get_xomo(m) for m in ['osp', 'osp2', 'ground', 'flight']]")
+
+
+def startup_time(code, repeats=5):
+    """
+    :param code: python code executed in a fresh interpreter
+    :param repeats:
+    :return: list of wall clock seconds
+    """
+    times = list()
+    for _ in range(repeats):
+        startat = time.time()
+        subprocess.check_call([sys.executable, '-c', code])
+        times.append(time.time() - startat)
+    return times
+
+
+if __name__ == '__main__':
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    baseline = min(startup_time('pass', repeats))
+    print('%-8s %-8s %10s %10s' % ('mode', 'model', 'best(s)', 'imports(s)'))
+    print('%-8s %-8s %10.3f %10s' % ('python', '-', baseline, '-'))
+    for model in sorted(MODELS):
+        best = min(startup_time(LAZY.format(model=model), repeats))
+        print('%-8s %-8s %10.3f %10.3f' % ('lazy', model, best, best - baseline))
+    best = min(startup_time(EAGER, repeats))
+    print('%-8s %-8s %10.3f %10.3f' % ('eager', 'all', best, best - baseline))
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2018, Jianfeng Chen <jchen37@ncsu.edu>
+# vim: set ts=4 sts=4 sw=4 expandtab smartindent:
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+
+"""
+Checking the WalkSAT repair (Benchmarks/SPL_Base/walksat.py) on SPL models, with a fixed random stream.
+ - the small models are repaired: every configuration seeded from a uniformly random one violates no clause
+ - after the flips, the objectives tracked by the IncrementalEvaluator are the ones of a full CompiledCNF.evaluate
+   (also for configurations left partially repaired by a tiny budget)
+Usage (at the project root): python -m Perf.walksat_check [individuals per model]
+"""
+
+from __future__ import division
+
+import random
+import sys
+
+import numpy as np
+
+from Benchmarks.SPL import DimacsModel
+from Benchmarks.SPL_Base.spl_batch import to_matrix
+from Benchmarks.SPL_Base.walksat import walksat
+
+REPAIRED = ['webportal', 'eshop']
+
+
+def walksat_check(name, size=20, max_flips=5000, seed=1):
+    """
+    :param name: SPL model
+    :param size: number of individuals
+    :param max_flips: flip budget of the repair
+    :param seed: seed of the random stream
+    :return: violations of the repaired individuals
+    """
+    model = DimacsModel(name)
+    rng = random.Random(seed)
+    violations = list()
+    for _ in range(size):
+        bits = format(rng.getrandbits(model.featureNum), '0%db' % model.featureNum)
+        ev = model.incremental(model.Individual(bits))
+        walksat(ev, max_flips, rng=rng)  # as DimacsModel.repair, keeping the evaluator to compare it
+        for normalized in (True, False):
+            full = model.cnf.evaluate(to_matrix([ev.ind]), normalized)[0]
+            assert np.allclose(ev.objectives(normalized), full), \
+                "%s: incremental objectives %s, full evaluation %s" % (name, ev.objectives(normalized), full)
+        assert ev.violated().tolist() == np.flatnonzero(model.cnf.violated(to_matrix([ev.ind]))[0]).tolist()
+        violations.append(int(ev.violations))
+    return violations
+
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for name in REPAIRED:
+        violations = walksat_check(name, size)
+        assert max(violations) == 0, "%s not repaired: %s" % (name, violations)
+        partial = walksat_check(name, size, max_flips=3)  # leaving violations, the objectives still agree
+        print('%-10s repaired %d/%d, 3 flips leave %.1f violations on average' %
+              (name, violations.count(0), size, np.mean(partial)))
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (C) 2018, Jianfeng Chen <jchen37@ncsu.edu>
+# vim: set ts=4 sts=4 sw=4 expandtab smartindent:
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+
+"""
+Global sensitivity screening of the decisions of a model (XOMO, POM3, ...).
+All points of a design are put into one DataFrame and evaluated by a single model.eval_pd_df call,
+so models with a batch evaluator (e.g. XOMO) evaluate the whole design at once.
+
+morris: elementary effects over r one-at-a-time trajectories. r * (d + 1) evaluations.
+sobol: first order and total Sobol indices (Saltelli 2010 / Jansen estimators). n * (d + 2) evaluations.
+Both return a DataFrame indexed by the decisions, with (statistic, objective) columns.
+screen/screen_model turn such a report into a reduced-dimension model (see Benchmarks/reduced.py).
+"""
+
+from __future__ import division
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+
+def _evaluate(model, X, normalized=True, rng=np.random):
+    """
+    Models with common random numbers (crn, e.g. XOMO, POM3) are evaluated under one shared calibration stream,
+    so that the effects are not drowned in the calibration noise.
+    :param model:
+    :param X: np.array (N, decNum) normalized decisions
+    :param rng: draws the seed of the shared stream, if the model has none
+    :return: np.array (N, objNum) objectives
+    """
+    df = model.init_random_pop(X.shape[0])
+    df[model.decs] = X
+    if hasattr(model, 'crn'):
+        seed, crn = model.seed, model.crn
+        model.seed = seed if seed is not None else int(rng.random() * 2 ** 31)
+        model.crn = True
+        try:
+            model.eval_pd_df(df, normalized=normalized, force_eval_all=True)
+        finally:
+            model.seed, model.crn = seed, crn
+    else:
+        model.eval_pd_df(df, normalized=normalized, force_eval_all=True)
+    return df[model.objs].values.astype(float)
+
+
+def _report(model, stats):
+    """
+    :param stats: dict statistic -> np.array (decNum, objNum)
+    :return: pd.DataFrame indexed by decisions, with columns (statistic, objective)
+    """
+    columns = pd.MultiIndex.from_product([list(stats), model.objs])
+    return pd.DataFrame(np.hstack(list(stats.values())), index=model.decs, columns=columns)
+
+
+def morris(model, r=20, levels=4, normalized=True, rng=np.random):
+    """
+    Morris elementary effects screening
+    :param model:
+    :param r: number of trajectories
+    :param levels: number of grid levels per decision (even)
+    :param normalized: evaluate the normalized objectives
+    :param rng: np.random module or np.random.Generator
+    :return: pd.DataFrame. statistics mu_star (mean |EE|), mu (mean EE) and sigma (sd of EE)
+    """
+    d = model.decNum
+    delta = levels / (2 * (levels - 1))
+    grid = np.arange(levels // 2) / (levels - 1)  # start points such that start + delta <= 1
+
+    low = rng.choice(grid, size=(r, d))
+    high = low + delta
+    up = rng.random((r, d)) < 0.5  # moving upwards or downwards
+    rank = np.argsort(np.argsort(rng.random((r, d)), axis=1), axis=1)  # step at which each decision moves
+
+    # trajectory points (r, d + 1, d). at point k, the decisions of rank < k have moved
+    moved = rank[:, None, :] < np.arange(d + 1)[None, :, None]
+    X = np.where(moved, np.where(up, high, low)[:, None, :], np.where(up, low, high)[:, None, :])
+
+    Y = _evaluate(model, X.reshape(-1, d), normalized, rng).reshape(r, d + 1, -1)
+    rows = np.arange(r)[:, None]
+    EE = (Y[rows, rank + 1] - Y[rows, rank]) / (np.where(up, delta, -delta)[..., None])  # (r, d, objNum)
+
+    return _report(model, {'mu_star': np.nanmean(np.abs(EE), axis=0),
+                           'mu'     : np.nanmean(EE, axis=0),
+                           'sigma'  : np.nanstd(EE, axis=0)})
+
+
+def sobol(model, n=256, normalized=True, rng=np.random):
+    """
+    Sobol indices from the Saltelli sampling scheme
+    :param model:
+    :param n: base sample size
+    :param normalized: evaluate the normalized objectives
+    :param rng: np.random module or np.random.Generator
+    :return: pd.DataFrame. statistics S1 (first order) and ST (total)
+    """
+    d = model.decNum
+    A, B = rng.random((n, d)), rng.random((n, d))
+    AB = np.repeat(A[None, :, :], d, axis=0)  # AB[i] is A with the i-th column taken from B
+    AB[np.arange(d), :, np.arange(d)] = B.T
+
+    Y = _evaluate(model, np.vstack([A, B, AB.reshape(-1, d)]), normalized, rng)
+    YA, YB, YAB = Y[:n], Y[n:2 * n], Y[2 * n:].reshape(d, n, -1)
+    V = np.nanvar(np.vstack([YA, YB]), axis=0)
+    V[V == 0] = np.inf  # constant objective: all indices are 0
+
+    return _report(model, {'S1': np.nanmean(YB * (YAB - YA), axis=1) / V,
+                           'ST': 0.5 * np.nanmean((YA - YAB) ** 2, axis=1) / V})
+
+
+def influence(report, stat=None):
+    """
+    Influence of every decision, normalized per objective (the most influential decision is 1), max over objectives
+    :param report: from morris or sobol
+    :param stat: statistic to use. mu_star (morris) or ST (sobol) if not set
+    :return: pd.Series indexed by decisions
+    """
+    if stat is None:
+        stat = 'mu_star' if 'mu_star' in report.columns.levels[0] else 'ST'
+    s = report[stat].abs()
+    s = s / s.max(axis=0).replace(0, np.inf)
+    return s.max(axis=1)
+
+
+def screen(report, threshold=0.1, min_keep=2, stat=None):
+    """
+    :param report: from morris or sobol
+    :param threshold: decisions whose influence is below threshold are inert
+    :param min_keep: keep at least this number of (most influential) decisions
+    :param stat: see influence
+    :return: list of active decisions, in the order of the model
+    """
+    inf = influence(report, stat)
+    keep = set(inf[inf >= threshold].index) | set(inf.sort_values(ascending=False).index[:min_keep])
+    return [d for d in report.index if d in keep]
+
+
+def screen_model(model, method='morris', threshold=0.1, baseline=0.5, seed=None, **kwargs):
+    """
+    Screening the model and fixing its inert decisions
+    :param model:
+    :param method: morris or sobol
+    :param threshold: see screen
+    :param baseline: normalized value of the inert decisions
+    :param seed: seed of the design and of the common random numbers, for a reproducible screening.
+                 the np.random module (rng in kwargs) if not set
+    :param kwargs: arguments of the method
+    :return: Benchmarks.reduced.ReducedModel
+    """
+    from Benchmarks.reduced import ReducedModel
+
+    if seed is not None:
+        kwargs['rng'] = np.random.default_rng(seed)
+    report = {'morris': morris, 'sobol': sobol}[method](model, **kwargs)
+    active = screen(report, threshold)
+    logging.debug("Screening %s by %s. Influence:\n%s" % (model.name, method, influence(report).to_string()))
+    logging.debug("Active decisions %d/%d: %s" % (len(active), model.decNum, ', '.join(active)))
+    return ReducedModel(model, active, baseline)
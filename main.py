@@ -30,26 +30,32 @@ import sys
 import time
 from multiprocessing import Process
 
-import numpy as np
+from Algorithms import get_algorithm
+from Benchmarks import get_model
 
-from Algorithms.NSGAII import nsgaii
-from Algorithms.div_conv import riot
-from Benchmarks.POM3 import get_pom3
-from Benchmarks.XOMO import get_xomo
-from Stats.statsReporting import write_results_to_txt
+# NOTE: heavy modules (numpy, pandas, deap, the models and algorithms) are imported only when a run needs them.
 
 
 def _get_model_for_name(model_str):
-    models = {
-        'p3a'   : get_pom3('p3a'),
-        'p3b'   : get_pom3('p3b'),
-        'p3c'   : get_pom3('p3c'),
-        'osp'   : get_xomo('osp'),
-        'osp2'  : get_xomo('osp2'),
-        'ground': get_xomo('ground'),
-        'flight': get_xomo('flight')
-    }
-    return models[model_str]
+    return get_model(model_str)
+
+
+def _simulated(model):
+    """the model holding the random sources (seed, crn), under a screened model"""
+    return getattr(model, 'model', model)
+
+
+def _report_profile(model):
+    """logging the phase times of the simulations of the run, for models with a profile (e.g. POM3)"""
+    profile = getattr(_simulated(model), 'profile', None)
+    if profile is not None:
+        logging.info('Simulation profile of %s\n%s' % (model.name, profile))
+
+
+def _seed_model(model, seed):
+    """evaluations of the run draw from streams of the run seed, whatever their order or process"""
+    if hasattr(_simulated(model), 'seed'):
+        _simulated(model).seed = seed
 
 
 def exec_nsgaii(model, expId):
@@ -60,13 +66,18 @@ def exec_nsgaii(model, expId):
     mutpb = 0.1
     # END OF CONFIGURATION
 
+    import numpy as np
+    from Stats.statsReporting import write_results_to_txt
+
     randL = random.randint(1, 1e6)
     np.random.seed(randL)
     random.seed(randL)
+    _seed_model(model, randL)
 
     startat = time.time()
-    res = nsgaii(model, mu, ngen, cxpb, mutpb)
+    res = get_algorithm('nsgaii')(model, mu, ngen, cxpb, mutpb)
     write_results_to_txt(expId, res, model, 'nsgaii', runtime=time.time() - startat)
+    _report_profile(model)
 
 
 def exec_riot(model, expId):
@@ -75,13 +86,18 @@ def exec_riot(model, expId):
     num_random = 1000
     # End of configuration
 
+    import numpy as np
+    from Stats.statsReporting import write_results_to_txt
+
     randL = random.randint(1, 1e6)
     np.random.seed(randL)
     random.seed(randL)
+    _seed_model(model, randL)
 
     startat = time.time()
-    res = riot(model, num_anchor=num_anchor, num_random=num_random)
+    res = get_algorithm('riot')(model, num_anchor=num_anchor, num_random=num_random)
     write_results_to_txt(expId, res, model, 'riot', runtime=time.time() - startat)
+    _report_profile(model)
 
 
 if __name__ == '__main__':
@@ -92,6 +108,12 @@ if __name__ == '__main__':
     parser.add_argument('-i', '--id', help="Set up experiment ID or use random if not set", required=False)
     parser.add_argument('-M', '--method', help="set method, nsgaii/riot", required=True)
     parser.add_argument('-r', '--repeat', help="set how many repeats, each repeat uses one core", required=False)
+    parser.add_argument('-s', '--screen', help="search only the influential decisions, screened by morris/sobol",
+                        required=False)
+    parser.add_argument('-c', '--crn', help="evaluate all configurations under common random numbers",
+                        action='store_true')
+    parser.add_argument('-p', '--profile', help="time the phases of the simulations, reported at the end of the run",
+                        action='store_true')
     args = vars(parser.parse_args())
 
     model = args['model'] or 'p3a'
@@ -104,6 +126,25 @@ if __name__ == '__main__':
                         level=logging.DEBUG)
     exec = getattr(sys.modules[__name__], 'exec_' + args['method'])
 
+    if args['screen']:
+        from Stats.sensitivity import screen_model
+
+        screen_seed = random.randint(1, 1e6)
+        logging.debug("Screening seed %d" % screen_seed)
+        model = screen_model(model, method=args['screen'], seed=screen_seed)
+
+    if args['crn']:
+        if not hasattr(_simulated(model), 'crn'):
+            raise ValueError('model %s has no common random numbers mode' % model.name)
+        _simulated(model).crn = True
+
+    if args['profile']:
+        if not hasattr(_simulated(model), 'profile'):
+            raise ValueError('model %s has no simulation profile' % model.name)
+        from Benchmarks.POM3_Base.pom3_profile import pom3_profile
+
+        _simulated(model).profile = pom3_profile()
+
     id_prefix = args['id'] or ''
 
     all_res = mp.Queue()